@@ -1,37 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schemas
+from app.api.pagination import PageParams, paginate
 from app.core.database import get_db
 
 router = APIRouter()
 
 
 @router.post("/", response_model=schemas.Account)
-def create_account(account: schemas.AccountCreate, db: Session = Depends(get_db)):
+async def create_account(
+    account: schemas.AccountCreate, db: AsyncSession = Depends(get_db)
+):
     db_account = models.Account(**account.model_dump())
     db.add(db_account)
-    db.commit()
-    db.refresh(db_account)
+    await db.commit()
+    await db.refresh(db_account)
     return db_account
 
 
-@router.get("/", response_model=list[schemas.Account])
-def list_accounts(db: Session = Depends(get_db)):
-    return db.query(models.Account).filter(models.Account.deleted_at.is_(None)).all()
+@router.get("/", response_model=schemas.Page[schemas.Account])
+async def list_accounts(
+    user_id: int = Query(..., description="Owner of the accounts"),
+    type: Optional[str] = Query(None, description="Only accounts of this type"),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
+    query = select(models.Account).where(
+        models.Account.user_id == user_id, models.Account.deleted_at.is_(None)
+    )
+    if type:
+        query = query.where(models.Account.type == type)
+    return await paginate(db, query, [models.Account.id], page)
 
 
 @router.delete("/{account_id}", response_model=schemas.Account)
-def soft_delete_account(account_id: int, db: Session = Depends(get_db)):
-    account = (
-        db.query(models.Account)
-        .filter(models.Account.id == account_id, models.Account.deleted_at.is_(None))
-        .first()
+async def soft_delete_account(account_id: int, db: AsyncSession = Depends(get_db)):
+    account = await db.scalar(
+        select(models.Account).where(
+            models.Account.id == account_id, models.Account.deleted_at.is_(None)
+        )
     )
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     from datetime import datetime, timezone
 
     account.deleted_at = datetime.now(timezone.utc)
-    db.commit()
+    await db.commit()
     return account
@@ -1,37 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schemas
+from app.api.pagination import PageParams, paginate
 from app.core.database import get_db
 
 router = APIRouter()
 
 
 @router.post("/", response_model=schemas.Bill)
-def create_bill(bill: schemas.BillCreate, db: Session = Depends(get_db)):
+async def create_bill(bill: schemas.BillCreate, db: AsyncSession = Depends(get_db)):
     db_bill = models.Bill(**bill.model_dump())
     db.add(db_bill)
-    db.commit()
-    db.refresh(db_bill)
+    await db.commit()
+    await db.refresh(db_bill)
     return db_bill
 
 
-@router.get("/", response_model=list[schemas.Bill])
-def list_bills(db: Session = Depends(get_db)):
-    return db.query(models.Bill).filter(models.Bill.deleted_at.is_(None)).all()
+@router.get("/", response_model=schemas.Page[schemas.Bill])
+async def list_bills(
+    user_id: int = Query(..., description="Owner of the bills' accounts"),
+    account_id: Optional[int] = Query(None, description="Only bills of this account"),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
+    query = (
+        select(models.Bill)
+        .join(models.Account, models.Account.id == models.Bill.account_id)
+        .where(models.Account.user_id == user_id, models.Bill.deleted_at.is_(None))
+    )
+    if account_id is not None:
+        query = query.where(models.Bill.account_id == account_id)
+    return await paginate(db, query, [models.Bill.id], page)
 
 
 @router.delete("/{bill_id}", response_model=schemas.Bill)
-def soft_delete_bill(bill_id: int, db: Session = Depends(get_db)):
-    bill = (
-        db.query(models.Bill)
-        .filter(models.Bill.id == bill_id, models.Bill.deleted_at.is_(None))
-        .first()
+async def soft_delete_bill(bill_id: int, db: AsyncSession = Depends(get_db)):
+    bill = await db.scalar(
+        select(models.Bill).where(
+            models.Bill.id == bill_id, models.Bill.deleted_at.is_(None)
+        )
     )
     if not bill:
         raise HTTPException(status_code=404, detail="Bill not found")
     from datetime import datetime, timezone
 
     bill.deleted_at = datetime.now(timezone.utc)
-    db.commit()
+    await db.commit()
     return bill
@@ -1,25 +1,175 @@
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query
+import numpy as np
+from anyio import from_thread
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.core.forecasting import forecast_balance
-from app.core.recurrence import expand_recurrence
-from app.models import Account, Bill, ForecastOverride, Transaction
-from app.schemas import (ForecastOverrideCreate, ForecastResponse,
-                         OverrideResponse)
+from app.core.forecast_cache import forecast_cache
+from app.core.forecasting import (BalanceChanges, balance_changes,
+                                  consolidated_forecast, first_below,
+                                  load_overrides, load_overrides_by_account,
+                                  run_forecast, run_scenarios, safe_to_spend,
+                                  simulate_forecast, tiered_alerts, to_cents)
+from app.core.materialized import read_series
+from app.core.specs import load_account_specs, load_event_specs
+from app.models import Account, ForecastOverride, UserSettings
+from app.schemas import (ConsolidatedForecastResponse, ForecastBatchResponse,
+                         ForecastChangesResponse, ForecastOverrideCreate,
+                         ForecastResponse, OverrideResponse,
+                         SafeToSpendResponse, ScenarioRequest,
+                         ScenariosResponse, SimulationResponse,
+                         TieredAlertsResponse)
 
 router = APIRouter()
 
+_simulation_pool = None
+
+
+def start_simulation_pool():
+    """Create the process pool for simulations if configured; runs at app startup."""
+    global _simulation_pool
+    if settings.SIMULATION_WORKERS > 0 and _simulation_pool is None:
+        _simulation_pool = ProcessPoolExecutor(max_workers=settings.SIMULATION_WORKERS)
+
+
+def shutdown_simulation_pool():
+    """Stop the simulation worker processes; runs at app shutdown."""
+    global _simulation_pool
+    if _simulation_pool is not None:
+        _simulation_pool.shutdown(cancel_futures=True)
+        _simulation_pool = None
+
+
+def _simulation_executor():
+    """Return the shared process pool for simulations, or None to run them inline."""
+    return _simulation_pool
+
+
+def get_accounts_data(db: Session, user_id=None, account_ids=None):
+    """
+    Load active accounts with their active bills and transactions in two queries.
+
+    Only the columns the engine reads are selected, and soft-deleted rows are
+    left out: one query for the accounts, one UNION ALL for their events.
+
+    Returns:
+        List[AccountSpec], Dict[int, List[EventSpec]], Dict[int, List[EventSpec]]
+    """
+    accounts = load_account_specs(db, user_id, account_ids)
+    bills, transactions = load_event_specs(db, [account.id for account in accounts])
+    return accounts, bills, transactions
+
 
 def get_account_data(db: Session, account_id: int):
-    account = db.query(Account).filter(Account.id == account_id).first()
-    bills = db.query(Bill).filter(Bill.account_id == account_id).all()
-    transactions = (
-        db.query(Transaction).filter(Transaction.account_id == account_id).all()
+    """
+    Load one active account with its bills and transactions, see get_accounts_data.
+
+    Returns:
+        AccountSpec | None, List[EventSpec], List[EventSpec]
+    """
+    accounts, bills, transactions = get_accounts_data(db, account_ids=[account_id])
+    if not accounts:
+        return None, [], []
+    return accounts[0], bills[account_id], transactions[account_id]
+
+
+async def _cached_forecast(
+    db: AsyncSession, account_id: int, horizon_days: int, buffer: float
+):
+    """
+    Return the JSON-ready /forecast payload of an account, or None if it does not exist.
+
+    The cache lookup, which may call Redis, and the forecast run in a worker
+    thread; only the queries go back to the event loop.
+    """
+    today = datetime.now().date()
+
+    def compute():
+        account, bills, transactions = from_thread.run(
+            db.run_sync, get_account_data, account_id
+        )
+        if not account:
+            return None
+        overrides = from_thread.run(
+            db.run_sync,
+            load_overrides,
+            account.id,
+            today,
+            today + timedelta(days=horizon_days - 1),
+        )
+        result = run_forecast(
+            account, bills, transactions, horizon_days, buffer, overrides, today
+        )
+        return jsonable_encoder(_forecast_response(result))
+
+    return await run_in_threadpool(
+        forecast_cache.get_or_compute, account_id, horizon_days, buffer, today, compute
     )
-    return account, bills, transactions
+
+
+async def _materialized_series(db: AsyncSession, account_id: int, horizon_days: int):
+    """
+    Return the daily balances of an account from the materialized store.
+
+    On a miss (no store yet, a store anchored on an earlier day or a longer
+    horizon) the series is computed and returned without being stored: reads
+    never write, and the nightly job rebuilds the store.
+
+    Returns:
+        np.ndarray | None: One balance per day, or None if the account does not exist.
+    """
+    today = datetime.now().date()
+    series = await db.run_sync(read_series, account_id, today, horizon_days)
+    if series is not None:
+        return series
+    accounts, bills, transactions = await db.run_sync(
+        get_accounts_data, account_ids=[account_id]
+    )
+    if not accounts:
+        return None
+    overrides = await db.run_sync(
+        load_overrides, account_id, today, today + timedelta(days=horizon_days - 1)
+    )
+    result = await run_in_threadpool(
+        run_forecast,
+        accounts[0],
+        bills[account_id],
+        transactions[account_id],
+        horizon_days,
+        overrides=overrides,
+        start_date=today,
+    )
+    return result.series
+
+
+def _series_response(series, buffer: float):
+    today = datetime.now().date()
+    days = [today + timedelta(days=i) for i in range(len(series))]
+    return {
+        "balances": {str(d): v for d, v in zip(days, series.tolist())},
+        "alerts": [
+            str(days[i]) for i in np.flatnonzero(to_cents(series) < to_cents(buffer))
+        ],
+        "events": [],
+    }
+
+
+def _forecast_response(result):
+    return {
+        "balances": {str(k): v for k, v in result.balances.items()},
+        "alerts": [str(d) for d in result.alerts],
+        "events": result.events,
+    }
 
 
 @router.get(
@@ -46,18 +196,22 @@ Returns projected daily balances and alert dates for an account, considering bil
       },
       "alerts": ["2024-06-03"],
       "events": [
-        {"type": "bill", "name": "Rent", "amount": 1000, "date": "2024-06-01"},
-        {"type": "transaction", "name": "Paycheck", "amount": 2000, "date": "2024-06-02"}
+        {"type": "bill", "id": 3, "name": "Rent", "amount": 1000, "date": "2024-06-01"},
+        {"type": "transaction", "id": 7, "name": "Paycheck", "amount": 2000, "date": "2024-06-02"}
       ]
     }
     ```
 """,
 )
-def get_forecast(
+async def get_forecast(
     account_id: int = Query(..., description="Account ID to forecast"),
     months: int = Query(3, ge=1, le=12, description="Number of months to forecast"),
     buffer: float = Query(50.0, ge=0, description="Buffer threshold for alerts"),
-    db: Session = Depends(get_db),
+    include_events: bool = Query(
+        True,
+        description="Include the event list; without it balances are read from the materialized store",
+    ),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Get forecast balances and alerts for an account.
@@ -66,90 +220,565 @@ def get_forecast(
     - A bill with `recurrence="MONTHLY"` and `start_date="2024-01-31"` will be forecasted for the last day of each month (e.g., Jan 31, Mar 31, skipping February if no Feb 31).
     - A transaction with `recurrence="WEEKLY"` and `date="2024-06-01"` will repeat every 7 days.
     """
-    account, bills, transactions = get_account_data(db, account_id)
-    if not account:
+    if not include_events:
+        series = await _materialized_series(db, account_id, months * 30)
+        if series is None:
+            return {"error": "Account not found"}
+        return _series_response(series, buffer)
+    response = await _cached_forecast(db, account_id, months * 30, buffer)
+    if response is None:
         return {"error": "Account not found"}
+    return response
+
+
+@router.get(
+    "/forecast/batch",
+    response_model=ForecastBatchResponse,
+    summary="Get forecasts for several accounts at once",
+    description="""
+Returns the same balances, alerts and events as `/forecast` for every account of a user,
+or for an explicit list of accounts, in a single request.
+
+**Example usage:**
+
+- **All accounts of a user:**
+    ```
+    GET /forecast/batch?user_id=1&months=3&buffer=50
+    ```
+
+- **Selected accounts:**
+    ```
+    GET /forecast/batch?account_ids=1&account_ids=2
+    ```
+""",
+)
+async def get_forecast_batch(
+    user_id: Optional[int] = Query(
+        None, description="Forecast every account of this user"
+    ),
+    account_ids: Optional[List[int]] = Query(
+        None, description="Account IDs to forecast"
+    ),
+    months: int = Query(3, ge=1, le=12, description="Number of months to forecast"),
+    buffer: float = Query(50.0, ge=0, description="Buffer threshold for alerts"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Forecast several accounts with a constant number of queries.
+    """
+    if user_id is None and not account_ids:
+        raise HTTPException(status_code=400, detail="Provide user_id or account_ids")
+    accounts, bills, transactions = await db.run_sync(
+        get_accounts_data, user_id, account_ids
+    )
     horizon_days = months * 30
-    balances, alerts = forecast_balance(
-        account, bills, transactions, horizon_days, buffer
+    today = datetime.now().date()
+    overrides = await db.run_sync(
+        load_overrides_by_account,
+        [account.id for account in accounts],
+        today,
+        today + timedelta(days=horizon_days - 1),
     )
-    # Collect upcoming events (bills and transactions) in the forecast window
+
+    def forecast_all():
+        return {
+            account.id: _forecast_response(
+                run_forecast(
+                    account,
+                    bills[account.id],
+                    transactions[account.id],
+                    horizon_days,
+                    buffer,
+                    overrides[account.id],
+                    today,
+                )
+            )
+            for account in accounts
+        }
+
+    return {"results": await run_in_threadpool(forecast_all)}
+
+
+@router.get(
+    "/forecast/consolidated",
+    response_model=ConsolidatedForecastResponse,
+    summary="Get the combined forecast of all accounts of a user",
+    description="""
+Projects the user's total liquidity across all of their accounts. Alerts are computed
+on the combined balance, and every event carries the `account_id` it belongs to.
+
+**Example usage:**
+```
+GET /forecast/consolidated?user_id=1&months=3&buffer=200
+```
+""",
+)
+async def get_forecast_consolidated(
+    user_id: int = Query(..., description="User whose accounts are combined"),
+    months: int = Query(3, ge=1, le=12, description="Number of months to forecast"),
+    buffer: float = Query(50.0, ge=0, description="Buffer threshold for alerts"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Forecast the combined balance of every account of a user.
+    """
+    accounts, bills, transactions = await db.run_sync(get_accounts_data, user_id)
+    horizon_days = months * 30
     today = datetime.now().date()
-    end_date = today + timedelta(days=horizon_days - 1)
-    events = []
-    for bill in bills:
-        dates = [
-            d.date() if hasattr(d, "date") else d
-            for d in expand_recurrence(
-                bill.start_date.date(),
-                bill.recurrence,
-                bill.end_date.date() if bill.end_date else end_date,
+    account_ids = [account.id for account in accounts]
+    overrides = await db.run_sync(
+        load_overrides_by_account,
+        account_ids,
+        today,
+        today + timedelta(days=horizon_days - 1),
+    )
+    result = await run_in_threadpool(
+        consolidated_forecast,
+        accounts,
+        bills,
+        transactions,
+        horizon_days,
+        buffer,
+        overrides,
+        today,
+    )
+    return {**_forecast_response(result), "account_ids": account_ids}
+
+
+@router.get(
+    "/forecast/changes",
+    response_model=ForecastChangesResponse,
+    response_model_exclude_none=True,
+    summary="Get the forecast as balance change points",
+    description="""
+Returns the projected balance only on the days it changes, which keeps long horizons
+(up to 10 years) small. Alerts are returned as runs of days below the buffer.
+Set `daily=true` to also get one balance per day.
+
+**Example usage:**
+```
+GET /forecast/changes?account_id=1&months=60&buffer=50
+```
+
+**Sample response:**
+```json
+{
+  "start_date": "2024-06-01",
+  "end_date": "2029-05-14",
+  "changes": [
+    {"date": "2024-06-01", "balance": 100.0},
+    {"date": "2024-06-15", "balance": -900.0}
+  ],
+  "alerts": [{"start": "2024-06-15", "end": "2024-06-29", "min_balance": -900.0}]
+}
+```
+""",
+)
+async def get_forecast_changes(
+    account_id: int = Query(..., description="Account ID to forecast"),
+    months: int = Query(3, ge=1, le=120, description="Number of months to forecast"),
+    buffer: float = Query(50.0, ge=0, description="Buffer threshold for alerts"),
+    daily: bool = Query(False, description="Also expand to one balance per day"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get the piecewise-constant balance forecast of an account.
+    """
+    account, bills, transactions = await db.run_sync(get_account_data, account_id)
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
+    horizon_days = months * 30
+    today = datetime.now().date()
+    overrides = await db.run_sync(
+        load_overrides, account_id, today, today + timedelta(days=horizon_days - 1)
+    )
+    changes = await run_in_threadpool(
+        balance_changes, account, bills, transactions, horizon_days, overrides, today
+    )
+    response = {
+        "start_date": today,
+        "end_date": today + timedelta(days=horizon_days - 1),
+        "changes": [
+            {"date": today + timedelta(days=day), "balance": balance}
+            for day, balance in zip(changes.days.tolist(), changes.balances.tolist())
+        ],
+        "alerts": [
+            {"start": start, "end": end, "min_balance": low}
+            for start, end, low in changes.below(buffer)
+        ],
+    }
+    if daily:
+        response["balances"] = {
+            str(today + timedelta(days=i)): balance
+            for i, balance in enumerate(changes.series().tolist())
+        }
+    return response
+
+
+@router.get(
+    "/forecast/safe_to_spend",
+    response_model=SafeToSpendResponse,
+    summary="Get how much can be spent without breaching the buffer",
+    description="""
+Returns, per account, the largest one-off amount that can be spent on a date (today by
+default) while keeping every projected balance after it at or above the buffer, along
+with the projected minimum balance and the day it occurs.
+
+**Example usage:**
+```
+GET /forecast/safe_to_spend?user_id=1&buffer=100
+GET /forecast/safe_to_spend?account_ids=1&on_date=2024-06-15
+```
+
+**Sample response:**
+```json
+{
+  "results": {
+    "1": {
+      "date": "2024-06-15",
+      "safe_to_spend": 350.0,
+      "min_balance": 450.0,
+      "min_balance_date": "2024-07-01"
+    }
+  }
+}
+```
+""",
+)
+async def get_safe_to_spend(
+    user_id: Optional[int] = Query(None, description="Every account of this user"),
+    account_ids: Optional[List[int]] = Query(None, description="Account IDs"),
+    on_date: Optional[date] = Query(
+        None, description="Day of the spend (default: today)"
+    ),
+    months: int = Query(3, ge=1, le=12, description="Number of months to forecast"),
+    buffer: float = Query(50.0, ge=0, description="Buffer to stay above"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Compute the safe-to-spend amount of several accounts with a constant number of queries.
+    """
+    if user_id is None and not account_ids:
+        raise HTTPException(status_code=400, detail="Provide user_id or account_ids")
+    horizon_days = months * 30
+    today = datetime.now().date()
+    if on_date and not today <= on_date < today + timedelta(days=horizon_days):
+        raise HTTPException(
+            status_code=400, detail="on_date must be inside the forecast window"
+        )
+    accounts, bills, transactions = await db.run_sync(
+        get_accounts_data, user_id, account_ids
+    )
+    overrides = await db.run_sync(
+        load_overrides_by_account,
+        [account.id for account in accounts],
+        today,
+        today + timedelta(days=horizon_days - 1),
+    )
+
+    def headroom_all():
+        results = {}
+        for account in accounts:
+            result = run_forecast(
+                account,
+                bills[account.id],
+                transactions[account.id],
+                horizon_days,
+                buffer,
+                overrides[account.id],
+                today,
             )
-        ]
-        for d in dates:
-            if today <= d <= end_date:
-                events.append(
-                    {
-                        "type": "bill",
-                        "name": bill.name,
-                        "amount": bill.amount,
-                        "date": d,
-                    }
-                )
-    for tx in transactions:
-        if tx.is_recurring and tx.recurrence:
-            dates = [
-                d.date() if hasattr(d, "date") else d
-                for d in forecast_balance.expand_recurrence(
-                    tx.date.date(),
-                    tx.recurrence,
-                    tx.end_date.date() if tx.end_date else end_date,
-                )
-            ]
-            for d in dates:
-                if today <= d <= end_date:
-                    events.append(
-                        {
-                            "type": "transaction",
-                            "name": tx.name,
-                            "amount": tx.amount,
-                            "date": d,
-                        }
-                    )
-        else:
-            d = tx.date.date() if hasattr(tx.date, "date") else tx.date
-            if today <= d <= end_date:
-                events.append(
-                    {
-                        "type": "transaction",
-                        "name": tx.name,
-                        "amount": tx.amount,
-                        "date": d,
-                    }
-                )
+            headroom = safe_to_spend(result.series, today, buffer, on_date)
+            results[account.id] = {
+                "date": headroom.date,
+                "safe_to_spend": headroom.amount,
+                "min_balance": headroom.min_balance,
+                "min_balance_date": headroom.min_date,
+            }
+        return results
+
+    return {"results": await run_in_threadpool(headroom_all)}
+
+
+def _scenario_result(name, series, start_date, buffer):
+    low = int(np.argmin(series))
+    return {
+        "name": name,
+        "alerts": [
+            str(start_date + timedelta(days=int(i)))
+            for i in np.flatnonzero(to_cents(series) < to_cents(buffer))
+        ],
+        "min_balance": float(series[low]),
+        "min_balance_date": start_date + timedelta(days=low),
+        "end_balance": float(series[-1]),
+    }
+
+
+@router.post(
+    "/forecast/scenarios",
+    response_model=ScenariosResponse,
+    summary="Evaluate what-if scenarios against the forecast",
+    description="""
+Evaluates hypothetical changes against an account's forecast without saving anything.
+Each scenario can skip occurrences, change the amount of a bill or transaction, add
+one-off expenses (`"event_type": "bill"`) or income (`"event_type": "transaction"`)
+and use its own buffer. All scenarios share one baseline expansion.
+
+**Example usage:**
+```json
+{
+  "account_id": 1,
+  "months": 3,
+  "buffer": 50,
+  "scenarios": [
+    {"name": "skip rent", "skip": [{"event_type": "bill", "event_id": 3, "event_date": "2024-07-01"}]},
+    {"name": "new laptop", "add": [{"date": "2024-06-20", "amount": 1200}], "buffer": 0},
+    {"name": "raise", "amounts": [{"event_type": "transaction", "event_id": 7, "amount": 2300}]}
+  ]
+}
+```
+""",
+)
+async def evaluate_scenarios(
+    request: ScenarioRequest, db: AsyncSession = Depends(get_db)
+):
+    """
+    Evaluate several what-if scenarios in one request; nothing is written.
+    """
+    accounts, bills, transactions = await db.run_sync(
+        get_accounts_data, account_ids=[request.account_id]
+    )
+    if not accounts:
+        raise HTTPException(status_code=404, detail="Account not found")
+    horizon_days = request.months * 30
+    today = datetime.now().date()
+    overrides = await db.run_sync(
+        load_overrides,
+        request.account_id,
+        today,
+        today + timedelta(days=horizon_days - 1),
+    )
+    baseline, results = await run_in_threadpool(
+        run_scenarios,
+        accounts[0],
+        bills[request.account_id],
+        transactions[request.account_id],
+        request.scenarios,
+        horizon_days,
+        overrides,
+        today,
+    )
+    return {
+        "baseline": _scenario_result("baseline", baseline, today, request.buffer),
+        "scenarios": [
+            _scenario_result(
+                scenario.name,
+                series,
+                today,
+                request.buffer if scenario.buffer is None else scenario.buffer,
+            )
+            for scenario, series in zip(request.scenarios, results)
+        ],
+    }
+
+
+@router.get(
+    "/forecast/simulate",
+    response_model=SimulationResponse,
+    summary="Get a Monte Carlo forecast for variable amounts",
+    description="""
+Simulates many balance paths where bills and transactions with an `amount_stddev` or
+`amount_samples` vary, and returns percentile bands of the daily balance and the
+probability of being below the buffer on each day.
+
+**Example usage:**
+```
+GET /forecast/simulate?account_id=1&months=3&buffer=50&paths=5000
+```
+
+**Sample response:**
+```json
+{
+  "paths": 5000,
+  "percentiles": {
+    "p5": {"2024-06-01": 80.5, "2024-06-02": 61.2},
+    "p50": {"2024-06-01": 100.0, "2024-06-02": 90.0}
+  },
+  "breach_probability": {"2024-06-01": 0.0, "2024-06-02": 0.03}
+}
+```
+""",
+)
+async def get_forecast_simulation(
+    account_id: int = Query(..., description="Account ID to forecast"),
+    months: int = Query(3, ge=1, le=12, description="Number of months to forecast"),
+    buffer: float = Query(50.0, ge=0, description="Buffer threshold for alerts"),
+    paths: int = Query(1000, ge=100, le=20000, description="Simulated paths"),
+    seed: Optional[int] = Query(None, description="Seed for reproducible results"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Simulate the forecast of an account with variable amounts.
+    """
+    accounts, bills, transactions = await db.run_sync(
+        get_accounts_data, account_ids=[account_id]
+    )
+    if not accounts:
+        raise HTTPException(status_code=404, detail="Account not found")
+    horizon_days = months * 30
+    today = datetime.now().date()
+    overrides = await db.run_sync(
+        load_overrides, account_id, today, today + timedelta(days=horizon_days - 1)
+    )
+    # Simulations are CPU-bound; keep them off the event loop
+    result = await run_in_threadpool(
+        simulate_forecast,
+        accounts[0],
+        bills[account_id],
+        transactions[account_id],
+        horizon_days,
+        buffer,
+        overrides,
+        today,
+        paths=paths,
+        seed=seed,
+        chunk_size=settings.SIMULATION_CHUNK_PATHS,
+        executor=_simulation_executor(),
+    )
+    days = [str(today + timedelta(days=i)) for i in range(horizon_days)]
     return {
-        "balances": {str(k): v for k, v in balances.items()},
-        "alerts": [str(d) for d in alerts],
-        "events": events,
+        "paths": result.paths,
+        "percentiles": {
+            f"p{q}": dict(zip(days, band.tolist()))
+            for q, band in result.percentiles.items()
+        },
+        "breach_probability": dict(zip(days, result.breach_probability.tolist())),
     }
 
 
 @router.get("/alerts")
-def get_alerts(
+async def get_alerts(
     account_id: int = Query(...),
     months: int = Query(3, ge=1, le=12),
     buffer: float = Query(50.0, ge=0),
-    db: Session = Depends(get_db),
+    runs: bool = Query(
+        False, description="Return [start, end, min_balance] runs instead of dates"
+    ),
+    first_only: bool = Query(
+        False, description="Stop at the first time the balance goes below the buffer"
+    ),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Returns dates when projected balances fall below the buffer.
+
+    With `runs=true` consecutive dates are collapsed into `[start, end, min_balance]`
+    runs. With `first_only=true` only the first run is computed, and the forecast
+    stops expanding events as soon as it ends.
     """
-    account, bills, transactions = get_account_data(db, account_id)
-    if not account:
-        return {"error": "Account not found"}
     horizon_days = months * 30
-    _, alerts = forecast_balance(account, bills, transactions, horizon_days, buffer)
-    return {"alerts": [str(d) for d in alerts]}
+    today = datetime.now().date()
+    if first_only:
+        accounts, bills, transactions = await db.run_sync(
+            get_accounts_data, account_ids=[account_id]
+        )
+        if not accounts:
+            return {"error": "Account not found"}
+        overrides = await db.run_sync(
+            load_overrides, account_id, today, today + timedelta(days=horizon_days - 1)
+        )
+        first = await run_in_threadpool(
+            first_below,
+            accounts[0],
+            bills[account_id],
+            transactions[account_id],
+            buffer,
+            horizon_days,
+            overrides,
+            today,
+        )
+        found = [first] if first else []
+    else:
+        series = await _materialized_series(db, account_id, horizon_days)
+        if series is None:
+            return {"error": "Account not found"}
+        found = BalanceChanges.from_series(today, series).below(buffer)
+    if runs:
+        return {"alerts": [[str(start), str(end), low] for start, end, low in found]}
+    if first_only:
+        return {"alerts": [str(start) for start, _, _ in found]}
+    return {
+        "alerts": [
+            str(start + timedelta(days=i))
+            for start, end, _ in found
+            for i in range((end - start).days + 1)
+        ]
+    }
+
+
+@router.get(
+    "/alerts/tiers",
+    response_model=TieredAlertsResponse,
+    summary="Get warning, critical and overdraft alerts at once",
+    description="""
+Returns, for each alert tier, the first day the projected balance drops below its
+threshold and how many days it stays below. The warning threshold defaults to the
+user's `buffer_amount`; the overdraft threshold is always 0.
+
+**Example usage:**
+```
+GET /alerts/tiers?account_id=1&warning=200&critical=50
+```
+
+**Sample response:**
+```json
+{
+  "account_id": 1,
+  "tiers": [
+    {"name": "warning", "threshold": 200.0, "first_date": "2024-06-03", "days_below": 12},
+    {"name": "critical", "threshold": 50.0, "first_date": "2024-06-10", "days_below": 4},
+    {"name": "overdraft", "threshold": 0.0, "first_date": null, "days_below": 0}
+  ]
+}
+```
+""",
+)
+async def get_tiered_alerts(
+    account_id: int = Query(..., description="Account ID to check"),
+    months: int = Query(3, ge=1, le=12, description="Number of months to forecast"),
+    warning: Optional[float] = Query(
+        None, description="Warning threshold (default: the user's buffer_amount)"
+    ),
+    critical: float = Query(20.0, description="Critical threshold"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Compute every alert tier of an account from a single balance series.
+    """
+    series = await _materialized_series(db, account_id, months * 30)
+    if series is None:
+        raise HTTPException(status_code=404, detail="Account not found")
+    if warning is None:
+        user_settings = await db.scalar(
+            select(UserSettings)
+            .join(Account, Account.user_id == UserSettings.user_id)
+            .where(Account.id == account_id, UserSettings.deleted_at.is_(None))
+        )
+        warning = user_settings.buffer_amount if user_settings else 50.0
+    thresholds = {"warning": warning, "critical": critical, "overdraft": 0.0}
+    crossings = tiered_alerts(series, datetime.now().date(), thresholds)
+    return {
+        "account_id": account_id,
+        "tiers": [
+            {
+                "name": name,
+                "threshold": thresholds[name],
+                "first_date": first_date,
+                "days_below": days_below,
+            }
+            for name, (first_date, days_below) in crossings.items()
+        ],
+    }
 
 
 @router.post(
@@ -186,9 +815,9 @@ Create or update an override to skip or modify a specific bill or transaction on
     ```
 """,
 )
-def create_override(
+async def create_override(
     override: ForecastOverrideCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Create or update a forecast override (skip or modify a specific event).
@@ -206,23 +835,23 @@ def create_override(
     }
     ```
     """
-    obj = (
-        db.query(ForecastOverride)
-        .filter_by(
-            user_id=override.user_id,
-            account_id=override.account_id,
-            event_type=override.event_type,
-            event_id=override.event_id,
-            event_date=override.event_date,
-        )
-        .first()
+    occurrence = select(ForecastOverride).filter_by(
+        user_id=override.user_id,
+        account_id=override.account_id,
+        event_type=override.event_type,
+        event_id=override.event_id,
+        event_date=override.event_date,
     )
-    if obj:
-        obj.skip = override.skip
-        obj.override_amount = override.override_amount
-    else:
-        obj = ForecastOverride(**override.model_dump())
-        db.add(obj)
-    db.commit()
-    db.refresh(obj)
+    obj = await db.scalar(occurrence)
+    if obj is None:
+        db.add(ForecastOverride(**override.model_dump()))
+        try:
+            await db.commit()
+        except IntegrityError:
+            # A concurrent request created the same occurrence; update it instead
+            await db.rollback()
+        obj = await db.scalar(occurrence)
+    obj.skip = override.skip
+    obj.override_amount = override.override_amount
+    await db.commit()
     return {"status": "override saved", "override_id": obj.id}
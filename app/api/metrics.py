@@ -0,0 +1,30 @@
+from fastapi import APIRouter
+
+from app.core.database import async_engine
+from app.core.forecast_cache import forecast_cache
+from app.core.pool_metrics import pool_stats
+from app.core.recurrence import recurrence_cache_stats
+
+router = APIRouter()
+
+
+@router.get(
+    "/internal/metrics",
+    summary="Get connection pool and cache statistics",
+    description="""
+Returns live statistics of the API's database connection pool (connections checked out,
+overflow in use, checkouts, timeouts and time spent waiting for a connection) and of the
+forecast and recurrence caches.
+
+**Example usage:**
+```
+GET /internal/metrics
+```
+""",
+)
+async def get_metrics():
+    return {
+        "db_pool": pool_stats(async_engine.pool),
+        "forecast_cache": forecast_cache.stats(),
+        "recurrence_cache": recurrence_cache_stats(),
+    }
@@ -0,0 +1,80 @@
+"""
+Keyset pagination for the list endpoints.
+
+Rows are ordered by a unique key (`id`, or `(date, id)`) and each page starts
+strictly after the last row of the previous one. Every page is then an index
+range scan however deep it is, and rows added meanwhile never shift a page.
+The cursor is the sort key of that last row, opaque to clients.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import HTTPException, Query
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class PageParams:
+    """`cursor` and `limit` query parameters, as a dependency."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(
+            None, description="`next_cursor` of the previous page"
+        ),
+        limit: int = Query(
+            DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"
+        ),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+
+def encode_cursor(values):
+    payload = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor, columns):
+    """Return the sort key in `cursor`, typed like `columns`; raises ValueError."""
+    values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("cursor does not match the sort key")
+    decoded = []
+    for column, value in zip(columns, values):
+        python_type = column.type.python_type
+        if python_type in (date, datetime) and isinstance(value, str):
+            decoded.append(python_type.fromisoformat(value))
+        elif isinstance(value, python_type) and not isinstance(value, bool):
+            decoded.append(value)
+        else:
+            raise ValueError(f"invalid {column.key} in cursor")
+    return decoded
+
+
+async def paginate(db, query, order_by, page: PageParams):
+    """
+    Return one page of `query` ordered by the unique key `order_by`.
+
+    Returns:
+        dict: `items` on this page and the `next_cursor`, None on the last page.
+    """
+    if page.cursor:
+        try:
+            after = decode_cursor(page.cursor, order_by)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(tuple_(*order_by) > tuple_(*after))
+    # One extra row tells whether there is a next page
+    result = await db.scalars(query.order_by(*order_by).limit(page.limit + 1))
+    items = result.all()
+    next_cursor = None
+    if len(items) > page.limit:
+        items = items[: page.limit]
+        next_cursor = encode_cursor([getattr(items[-1], c.key) for c in order_by])
+    return {"items": items, "next_cursor": next_cursor}
@@ -1,46 +1,77 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schemas
+from app.api.pagination import PageParams, paginate
 from app.core.database import get_db
 
 router = APIRouter()
 
 
 @router.post("/", response_model=schemas.Transaction)
-def create_transaction(
-    transaction: schemas.TransactionCreate, db: Session = Depends(get_db)
+async def create_transaction(
+    transaction: schemas.TransactionCreate, db: AsyncSession = Depends(get_db)
 ):
     db_transaction = models.Transaction(**transaction.model_dump())
     db.add(db_transaction)
-    db.commit()
-    db.refresh(db_transaction)
+    await db.commit()
+    await db.refresh(db_transaction)
     return db_transaction
 
 
-@router.get("/", response_model=list[schemas.Transaction])
-def list_transactions(db: Session = Depends(get_db)):
-    return (
-        db.query(models.Transaction)
-        .filter(models.Transaction.deleted_at.is_(None))
-        .all()
+@router.get("/", response_model=schemas.Page[schemas.Transaction])
+async def list_transactions(
+    user_id: int = Query(..., description="Owner of the transactions' accounts"),
+    account_id: Optional[int] = Query(
+        None, description="Only transactions of this account"
+    ),
+    start_date: Optional[date] = Query(None, description="First day, inclusive"),
+    end_date: Optional[date] = Query(None, description="Last day, inclusive"),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    List transactions by date, oldest first.
+    """
+    query = (
+        select(models.Transaction)
+        .join(models.Account, models.Account.id == models.Transaction.account_id)
+        .where(
+            models.Account.user_id == user_id,
+            models.Transaction.deleted_at.is_(None),
+        )
     )
+    if account_id is not None:
+        query = query.where(models.Transaction.account_id == account_id)
+    if start_date:
+        query = query.where(
+            models.Transaction.date >= datetime.combine(start_date, time.min)
+        )
+    if end_date:
+        next_day = datetime.combine(end_date + timedelta(days=1), time.min)
+        query = query.where(models.Transaction.date < next_day)
+    order_by = [models.Transaction.date, models.Transaction.id]
+    return await paginate(db, query, order_by, page)
 
 
 @router.delete("/{transaction_id}", response_model=schemas.Transaction)
-def soft_delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
-    transaction = (
-        db.query(models.Transaction)
-        .filter(
+async def soft_delete_transaction(
+    transaction_id: int, db: AsyncSession = Depends(get_db)
+):
+    transaction = await db.scalar(
+        select(models.Transaction).where(
             models.Transaction.id == transaction_id,
             models.Transaction.deleted_at.is_(None),
         )
-        .first()
     )
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
     from datetime import datetime, timezone
 
     transaction.deleted_at = datetime.now(timezone.utc)
-    db.commit()
+    await db.commit()
     return transaction
@@ -1,9 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.pagination import PageParams, paginate
 from app.core.database import get_db
 from app.core.security import get_password_hash
 from app.models import User
+from app.schemas import Page
+from app.schemas import User as UserSchema
 from app.schemas import UserCreate
 
 router = APIRouter()
@@ -11,12 +16,13 @@ router = APIRouter()
 
 @router.get(
     "/users",
-    summary="List all users",
-    description="Returns a list of all users in the system.",
-    response_description="A list of user objects.",
+    response_model=Page[UserSchema],
+    summary="List users",
+    description="Returns one page of the users in the system, ordered by id.",
+    response_description="A page of user objects and the cursor of the next page.",
 )
-def list_users(db: Session = Depends(get_db)):
-    return db.query(User).all()
+async def list_users(page: PageParams = Depends(), db: AsyncSession = Depends(get_db)):
+    return await paginate(db, select(User), [User.id], page)
 
 
 @router.post(
@@ -35,12 +41,13 @@ Create a new user with an email and password.
 """,
     response_description="The created user object.",
 )
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.email == user.email).first():
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
+    if await db.scalar(select(User.id).where(User.email == user.email)):
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = get_password_hash(user.password)
+    # Hashing is CPU-bound; keep it off the event loop
+    hashed_password = await run_in_threadpool(get_password_hash, user.password)
     user_obj = User(email=user.email, hashed_password=hashed_password)
     db.add(user_obj)
-    db.commit()
-    db.refresh(user_obj)
+    await db.commit()
+    await db.refresh(user_obj)
     return user_obj
@@ -20,6 +20,18 @@ class Settings(BaseSettings):
     REDIS_URL: str = "redis://redis:6379/0"
     SECRET_KEY: str = "$uper$ecre7!"
     LOG_LEVEL: str = "DEBUG"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a connection
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced, -1 never
+    DB_POOL_PRE_PING: bool = True  # Ping on checkout; off saves a round trip
+    RECURRENCE_CACHE_SIZE: int = 4096
+    FORECAST_CACHE_SIZE: int = 1024
+    FORECAST_CACHE_REDIS: bool = False
+    FORECAST_CACHE_TTL_SECONDS: int = 3600
+    MATERIALIZED_HORIZON_DAYS: int = 360
+    SIMULATION_WORKERS: int = 0  # Process pool size for simulations, 0 runs inline
+    SIMULATION_CHUNK_PATHS: int = 2000
 
     model_config = ConfigDict(env_file=env_file)
 
@@ -0,0 +1,205 @@
+"""
+Versioned cache for forecast results.
+
+Entries are keyed by (account_id, horizon, buffer, start date, data version).
+The data version of an account is bumped after every committed change to its
+bills, transactions, overrides or balance, so stale entries are never read
+again and simply age out of the LRU. An optional Redis tier shares entries and
+versions between workers.
+
+Without Redis, versions are bumped only in the worker that committed the
+change, so other workers may serve a stale entry until it expires. Local
+entries therefore expire after `ttl_seconds` too, which bounds how stale a
+result can be.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Account, Bill, ForecastOverride, Transaction
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "fc:ver:{account_id}"
+ENTRY_KEY = "fc:{account_id}:{horizon_days}:{buffer}:{start_date}:{version}"
+
+
+class ForecastCache:
+    def __init__(self, maxsize=1024, redis_client=None, ttl_seconds=3600):
+        self.maxsize = maxsize
+        self.redis = redis_client
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def version(self, account_id):
+        """Return the current data version of an account."""
+        if self.redis is not None:
+            try:
+                return int(
+                    self.redis.get(VERSION_KEY.format(account_id=account_id)) or 0
+                )
+            except redis.RedisError:
+                logger.warning(
+                    "Forecast cache: Redis unavailable, using local versions"
+                )
+        return self._versions.get(account_id, 0)
+
+    def bump(self, account_ids):
+        """Invalidate every cached forecast of the given accounts."""
+        with self._lock:
+            for account_id in account_ids:
+                self._versions[account_id] = self._versions.get(account_id, 0) + 1
+            for key in [k for k in self._entries if k[0] in account_ids]:
+                del self._entries[key]
+        if self.redis is not None:
+            try:
+                pipe = self.redis.pipeline()
+                for account_id in account_ids:
+                    pipe.incr(VERSION_KEY.format(account_id=account_id))
+                pipe.execute()
+            except redis.RedisError:
+                logger.warning("Forecast cache: failed to bump Redis versions")
+
+    def get_or_compute(self, account_id, horizon_days, buffer, start_date, compute):
+        """
+        Return the cached result for the key, or call `compute()` and cache it.
+
+        The version is read before `compute` loads any data, so a write that
+        lands in between can only make the entry fresher than its key.
+        `compute` must return a JSON-serializable value, or None to skip caching.
+        """
+        version = self.version(account_id)
+        key = (account_id, horizon_days, buffer, start_date, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        redis_key = ENTRY_KEY.format(
+            account_id=account_id,
+            horizon_days=horizon_days,
+            buffer=buffer,
+            start_date=start_date,
+            version=version,
+        )
+        if self.redis is not None:
+            try:
+                cached = self.redis.get(redis_key)
+            except redis.RedisError:
+                cached = None
+            if cached is not None:
+                value = json.loads(cached)
+                self._store(key, value)
+                with self._lock:
+                    self.redis_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        value = compute()
+        if value is not None:
+            self._store(key, value)
+            if self.redis is not None:
+                try:
+                    self.redis.set(redis_key, json.dumps(value), ex=self.ttl_seconds)
+                except redis.RedisError:
+                    logger.warning("Forecast cache: failed to write to Redis")
+        return value
+
+    def _store(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self.hits = self.redis_hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return hit/miss/eviction counters and the hit ratio."""
+        with self._lock:
+            hits = self.hits + self.redis_hits
+            lookups = hits + self.misses
+            return {
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+            }
+
+
+forecast_cache = ForecastCache(
+    maxsize=settings.FORECAST_CACHE_SIZE,
+    redis_client=(
+        redis.Redis.from_url(settings.REDIS_URL)
+        if settings.FORECAST_CACHE_REDIS
+        else None
+    ),
+    ttl_seconds=settings.FORECAST_CACHE_TTL_SECONDS,
+)
+
+
+def _account_ids(target):
+    """Return the ids of the accounts whose forecast depends on `target`."""
+    if isinstance(target, Account):
+        return {target.id}
+    ids = {target.account_id}
+    # An item moved to another account invalidates the old one too
+    ids.update(inspect(target).attrs.account_id.history.deleted or ())
+    return ids
+
+
+def _mark_dirty(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("forecast_cache_dirty", set()).update(
+            _account_ids(target)
+        )
+
+
+def after_commit(session):
+    dirty = session.info.pop("forecast_cache_dirty", None)
+    if dirty:
+        forecast_cache.bump(dirty)
+
+
+def after_rollback(session):
+    session.info.pop("forecast_cache_dirty", None)
+
+
+def register_cache_listeners():
+    for cls in (Account, Bill, Transaction, ForecastOverride):
+        event.listen(cls, "after_insert", _mark_dirty)
+        event.listen(cls, "after_update", _mark_dirty)
+        event.listen(cls, "after_delete", _mark_dirty)
+    event.listen(Session, "after_commit", after_commit)
+    event.listen(Session, "after_rollback", after_rollback)
@@ -1,13 +1,653 @@
 """
 Forecasting logic for account balances and cash flow.
-Future implementation: forecast daily balances and buffer alerts.
+Forecasts daily balances, buffer alerts and the underlying event stream.
+
+Money is handled as int64 cents inside the engine, so sums over long horizons
+are exact and alert boundaries do not drift; amounts are converted from and to
+dollars only where they enter and leave it.
 """
 
-from collections import defaultdict
-from datetime import datetime, timedelta
+import heapq
+from datetime import date, datetime, timedelta
+from operator import itemgetter
+from typing import List, NamedTuple
+
+import numpy as np
+
+from app.core.recurrence import expand_batch, iter_recurrence
+from app.core.specs import bill_spec, load_override_specs, transaction_spec
+
+
+def to_cents(amounts):
+    """Convert dollar amounts (scalar or array) to int64 cents."""
+    return np.rint(np.asarray(amounts, dtype=float) * 100).astype(np.int64)
+
+
+def from_cents(cents):
+    """Convert int64 cents back to dollar floats."""
+    return np.asarray(cents) / 100
+
+
+class ForecastResult(NamedTuple):
+    """
+    Everything a forecast produces, computed in a single pass.
+
+    Attributes:
+        start_date: First day of the forecast.
+        cents: Balance in cents at the end of each day, one entry per horizon day.
+        alerts: Dates when the balance falls below the buffer.
+        events: Occurrences in the window, sorted by date, with overrides applied.
+    """
+
+    start_date: date
+    cents: np.ndarray
+    alerts: List[date]
+    events: List[dict]
+
+    @property
+    def series(self):
+        """Balance in dollars at the end of each day."""
+        return from_cents(self.cents)
+
+    @property
+    def days(self):
+        return [self.start_date + timedelta(days=i) for i in range(len(self.series))]
+
+    @property
+    def balances(self):
+        return dict(zip(self.days, self.series.tolist()))
+
+
+class BalanceChanges(NamedTuple):
+    """
+    Piecewise-constant balance of an account, one segment per event day.
+
+    Attributes:
+        start_date: First day of the forecast.
+        horizon_days: Number of days covered.
+        days: Day offset where each segment starts; the first is always 0.
+        balances: Balance over each segment.
+    """
+
+    start_date: date
+    horizon_days: int
+    days: np.ndarray
+    balances: np.ndarray
+
+    @classmethod
+    def from_series(cls, start_date, series):
+        """Compress one balance per day into change points."""
+        days = np.flatnonzero(np.diff(series, prepend=np.nan) != 0)
+        return cls(start_date, len(series), days, series[days])
+
+    @property
+    def ends(self):
+        """Day offset of the last day of each segment."""
+        return np.append(self.days[1:], self.horizon_days) - 1
+
+    def series(self):
+        """Expand to one balance per day."""
+        return np.repeat(self.balances, self.ends - self.days + 1)
+
+    def below(self, buffer_amount, first_only=False):
+        """
+        Return the runs of days when the balance is below `buffer_amount`.
+
+        Returns:
+            List[Tuple[date, date, float]]: (first day, last day, minimum balance) of each run.
+        """
+        low = to_cents(self.balances) < to_cents(buffer_amount)
+        # A run starts where `low` turns on and stops where it turns off
+        edges = np.diff(np.concatenate(([False], low, [False])).astype(np.int8))
+        starts = np.flatnonzero(edges == 1)
+        stops = np.flatnonzero(edges == -1)
+        if first_only:
+            starts, stops = starts[:1], stops[:1]
+        ends = self.ends
+        return [
+            (
+                self.start_date + timedelta(days=int(self.days[i])),
+                self.start_date + timedelta(days=int(ends[j - 1])),
+                float(self.balances[i:j].min()),
+            )
+            for i, j in zip(starts, stops)
+        ]
+
+
+class SafeToSpend(NamedTuple):
+    """
+    Headroom of a balance series above the buffer from a given day on.
+
+    Attributes:
+        date: Day the one-off spend would happen.
+        amount: Largest amount that keeps every later balance at or above the buffer.
+        min_balance: Lowest projected balance from `date` to the end of the horizon.
+        min_date: First day that minimum is reached.
+    """
+
+    date: date
+    amount: float
+    min_balance: float
+    min_date: date
+
+
+def safe_to_spend(series, start_date, buffer_amount=50.0, on_date=None):
+    """
+    Compute how much can be spent on `on_date` without breaching the buffer later.
+
+    A spend lowers every balance from its day on, so the headroom is the suffix
+    minimum of the series minus the buffer, found with one reversed running
+    minimum over the series.
+
+    Returns:
+        SafeToSpend: Headroom and the minimum it is bound by.
+    """
+    offset = (on_date - start_date).days if on_date else 0
+    if not 0 <= offset < len(series):
+        raise ValueError(f"{on_date} is outside of the forecast window")
+    cents = to_cents(series)
+    suffix_min = np.minimum.accumulate(cents[::-1])[::-1]
+    low = int(suffix_min[offset])
+    low_offset = offset + int(np.argmax(cents[offset:] == low))
+    return SafeToSpend(
+        start_date + timedelta(days=offset),
+        max(low - int(to_cents(buffer_amount)), 0) / 100,
+        low / 100,
+        start_date + timedelta(days=low_offset),
+    )
+
+
+def tiered_alerts(series, start_date, thresholds):
+    """
+    Find when a balance series first drops below each of several thresholds.
+
+    The running minimum is computed once; as it never increases, the first
+    crossing of every threshold is a binary search into it. The days below
+    each threshold are counted the same way against the sorted series.
+
+    Args:
+        series: Balance at the end of each day.
+        start_date: Day of the first balance.
+        thresholds: Dict mapping a tier name to its threshold.
+    Returns:
+        Dict[str, Tuple[date | None, int]]: First day below the threshold, if any,
+            and the number of days below it, per tier.
+    """
+    cents = to_cents(series)
+    running_min = np.minimum.accumulate(cents)
+    ordered = np.sort(cents)
+    names = list(thresholds)
+    levels = to_cents([thresholds[name] for name in names])
+    # -running_min is non-decreasing: the first day with running_min < level
+    first = np.searchsorted(-running_min, -levels, side="right")
+    below = np.searchsorted(ordered, levels, side="left")
+    return {
+        name: (
+            start_date + timedelta(days=int(day)) if day < len(series) else None,
+            int(count),
+        )
+        for name, day, count in zip(names, first, below)
+    }
+
+
+def load_overrides(db, account_id, start_date, end_date):
+    """
+    Load the forecast overrides of an account inside a date window.
+
+    Returns:
+        Dict[tuple, OverrideSpec]: Overrides keyed by (event_type, event_id, event_date).
+    """
+    return load_override_specs(db, [account_id], start_date, end_date)[account_id]
+
+
+def load_overrides_by_account(db, account_ids, start_date, end_date):
+    """
+    Load the forecast overrides of several accounts with a single query.
+
+    Returns:
+        Dict[int, Dict[tuple, OverrideSpec]]: Per-account overrides keyed like `load_overrides`.
+    """
+    return load_override_specs(db, account_ids, start_date, end_date)
+
+
+def run_forecast(
+    account,
+    bills,
+    transactions,
+    horizon_days=90,
+    buffer_amount=50.0,
+    overrides=None,
+    start_date=None,
+):
+    """
+    Forecast daily balances, alerts and the event stream of an account in one pass.
+
+    Args:
+        account: Account object with current_balance and id.
+        bills: Bill objects or EventSpecs of the account.
+        transactions: Transaction objects or EventSpecs of the account.
+        horizon_days: Number of days to forecast (default: 90).
+        buffer_amount: User-configurable buffer threshold.
+        overrides: Overrides keyed by (event_type, event_id, event_date), see `load_overrides`.
+        start_date: First day of the forecast (default: today).
+    Returns:
+        ForecastResult: Balances, alerts and events, all with the same overrides applied.
+    """
+    today = start_date or datetime.now().date()
+    offsets, cents, events = _expand_events(
+        bills, transactions, today, horizon_days, overrides
+    )
 
-from app.core.recurrence import expand_recurrence
-from app.models import ForecastOverride
+    # Scatter the events into a per-day delta array and accumulate it once
+    deltas = _daily_cents(offsets, cents, horizon_days)
+    deltas[0] += to_cents(account.current_balance)
+    series = np.cumsum(deltas)
+
+    alerts = [
+        today + timedelta(days=int(i))
+        for i in np.flatnonzero(series < to_cents(buffer_amount))
+    ]
+    return ForecastResult(today, series, alerts, events)
+
+
+def consolidated_forecast(
+    accounts,
+    bills,
+    transactions,
+    horizon_days=90,
+    buffer_amount=50.0,
+    overrides=None,
+    start_date=None,
+):
+    """
+    Forecast the combined balance of several accounts.
+
+    The date-sorted event streams of the accounts are k-way merged, so the
+    combined series is built in O(total events * log accounts) plus one fill of
+    the horizon, instead of one horizon walk per account.
+
+    Args:
+        accounts: Account objects with current_balance and id.
+        bills: Dict mapping account id to its Bill objects or EventSpecs.
+        transactions: Dict mapping account id to its Transaction objects or EventSpecs.
+        horizon_days: Number of days to forecast (default: 90).
+        buffer_amount: Buffer threshold applied to the combined balance.
+        overrides: Dict mapping account id to its overrides, see `load_overrides`.
+        start_date: First day of the forecast (default: today).
+    Returns:
+        ForecastResult: Combined balances and alerts; each event carries its account_id.
+    """
+    today = start_date or datetime.now().date()
+    overrides = overrides or {}
+    opening = 0
+    streams = []
+    for account in accounts:
+        opening += int(to_cents(account.current_balance))
+        offsets, cents, events = _expand_events(
+            bills.get(account.id, []),
+            transactions.get(account.id, []),
+            today,
+            horizon_days,
+            overrides.get(account.id),
+        )
+        streams.append(
+            zip(
+                offsets.tolist(),
+                cents.tolist(),
+                [{**event, "account_id": account.id} for event in events],
+            )
+        )
+
+    # Walk the merged stream once, recording the balance after each event day
+    change_days, change_balances, events = [], [], []
+    balance = opening
+    for offset, amount, event in heapq.merge(*streams, key=itemgetter(0)):
+        balance += amount
+        if change_days and change_days[-1] == offset:
+            change_balances[-1] = balance
+        else:
+            change_days.append(offset)
+            change_balances.append(balance)
+        events.append(event)
+
+    # Each day takes the balance of the last change point on or before it;
+    # days before the first change point index -1, i.e. the appended opening
+    last_change = (
+        np.searchsorted(change_days, np.arange(horizon_days), side="right") - 1
+    )
+    series = np.append(np.array(change_balances, dtype=np.int64), opening)[last_change]
+    alerts = [
+        today + timedelta(days=int(i))
+        for i in np.flatnonzero(series < to_cents(buffer_amount))
+    ]
+    return ForecastResult(today, series, alerts, events)
+
+
+def balance_changes(
+    account, bills, transactions, horizon_days=90, overrides=None, start_date=None
+):
+    """
+    Forecast an account as change points instead of one balance per day.
+
+    The cost grows with the number of occurrences in the window, not with its
+    length, so multi-year horizons stay cheap.
+
+    Returns:
+        BalanceChanges: The balance after each event day, overrides applied.
+    """
+    today = start_date or datetime.now().date()
+    offsets, cents, _ = _expand_events(
+        bills, transactions, today, horizon_days, overrides
+    )
+    days, first = np.unique(offsets, return_index=True)
+    totals = np.add.reduceat(cents, first) if len(first) else cents
+    opening = to_cents(account.current_balance)
+    balances = opening + np.cumsum(totals)
+    if not len(days) or days[0] != 0:
+        days = np.insert(days, 0, 0)
+        balances = np.insert(balances, 0, opening)
+    return BalanceChanges(today, horizon_days, days, from_cents(balances))
+
+
+def first_below(
+    account,
+    bills,
+    transactions,
+    buffer_amount=50.0,
+    horizon_days=90,
+    overrides=None,
+    start_date=None,
+):
+    """
+    Find the first run of days when the balance is below the buffer.
+
+    Occurrences are generated lazily and merged by date, so nothing after the
+    end of the first run is ever expanded.
+
+    Returns:
+        Tuple[date, date, float] | None: (first day, last day, minimum balance)
+            of the first run, or None if the balance never drops below the buffer.
+    """
+    today = start_date or datetime.now().date()
+    end_date = today + timedelta(days=horizon_days - 1)
+    overrides = overrides or {}
+    buffer_cents = int(to_cents(buffer_amount))
+
+    def occurrences(event_type, item, sign, start, rule, end):
+        stop = min(_day(end), end_date) if end else end_date
+        cents = sign * int(to_cents(item.amount))
+        for occurrence in iter_recurrence(start, rule, stop, window_start=today):
+            day = _day(occurrence)
+            override = overrides.get((event_type, item.id, day))
+            if override is None:
+                yield day, cents
+            elif not override.skip:
+                if override.override_amount is None:
+                    yield day, cents
+                else:
+                    yield day, sign * int(to_cents(override.override_amount))
+
+    streams = [occurrences(*item) for item in _forecast_items(bills, transactions)]
+    balance = int(to_cents(account.current_balance))
+    segment_start, run_start, run_min = today, None, None
+    # Sentinel past the horizon closes the last segment
+    merged = heapq.merge(*streams, [(end_date + timedelta(days=1), 0)])
+    for day, cents in merged:
+        if day > segment_start:
+            # `balance` held from segment_start through the day before `day`
+            if balance < buffer_cents:
+                if run_start is None:
+                    run_start, run_min = segment_start, balance
+                run_min = min(run_min, balance)
+            elif run_start is not None:
+                return run_start, segment_start - timedelta(days=1), run_min / 100
+            segment_start = day
+        balance += cents
+    if run_start is not None:
+        return run_start, end_date, run_min / 100
+    return None
+
+
+def run_scenarios(
+    account,
+    bills,
+    transactions,
+    scenarios,
+    horizon_days=90,
+    overrides=None,
+    start_date=None,
+):
+    """
+    Evaluate what-if scenarios against a shared baseline forecast.
+
+    The baseline occurrences are expanded once. Each scenario becomes a sparse
+    list of per-day amount changes, accumulated on top of the baseline series,
+    so a scenario costs as much as the occurrences it touches plus one cumsum.
+
+    Args:
+        scenarios: Objects with `skip` (event_type, event_id, event_date),
+            `amounts` (event_type, event_id, amount) and `add` (event_type,
+            date, amount) lists. Amounts are magnitudes, signed by event type.
+        (other args as in `run_forecast`)
+    Returns:
+        Tuple[np.ndarray, List[np.ndarray]]: Baseline series and one series per scenario.
+    """
+    today = start_date or datetime.now().date()
+    offsets, cents, events = _expand_events(
+        bills, transactions, today, horizon_days, overrides
+    )
+    deltas = _daily_cents(offsets, cents, horizon_days)
+    deltas[0] += to_cents(account.current_balance)
+    baseline = np.cumsum(deltas)
+
+    by_occurrence, by_item = {}, {}
+    for pos, event in enumerate(events):
+        by_occurrence[(event["type"], event["id"], event["date"])] = pos
+        by_item.setdefault((event["type"], event["id"]), []).append(pos)
+
+    results = []
+    for scenario in scenarios:
+        days, changes = [], []
+        skipped = set()
+        for skip in scenario.skip:
+            pos = by_occurrence.get((skip.event_type, skip.event_id, skip.event_date))
+            if pos is not None and pos not in skipped:
+                skipped.add(pos)
+                days.append(offsets[pos])
+                changes.append(-cents[pos])
+        for change in scenario.amounts:
+            sign = -1 if change.event_type == "bill" else 1
+            for pos in by_item.get((change.event_type, change.event_id), ()):
+                if pos not in skipped:
+                    days.append(offsets[pos])
+                    changes.append(sign * to_cents(change.amount) - cents[pos])
+        for one_off in scenario.add:
+            offset = (one_off.date - today).days
+            if 0 <= offset < horizon_days:
+                sign = -1 if one_off.event_type == "bill" else 1
+                days.append(offset)
+                changes.append(sign * to_cents(one_off.amount))
+        delta = _daily_cents(
+            np.array(days, dtype=np.int64),
+            np.array(changes, dtype=np.int64),
+            horizon_days,
+        )
+        results.append(from_cents(baseline + np.cumsum(delta)))
+    return from_cents(baseline), results
+
+
+class SimulationResult(NamedTuple):
+    """
+    Distribution of simulated daily balances.
+
+    Attributes:
+        start_date: First day of the forecast.
+        percentiles: Dict mapping each percentile to its daily balance band.
+        breach_probability: Share of paths below the buffer on each day.
+        paths: Number of simulated paths.
+    """
+
+    start_date: date
+    percentiles: dict
+    breach_probability: np.ndarray
+    paths: int
+
+
+def simulate_forecast(
+    account,
+    bills,
+    transactions,
+    horizon_days=90,
+    buffer_amount=50.0,
+    overrides=None,
+    start_date=None,
+    paths=1000,
+    percentiles=(5, 25, 50, 75, 95),
+    seed=None,
+    chunk_size=2000,
+    executor=None,
+):
+    """
+    Monte Carlo forecast for bills and transactions whose amounts vary.
+
+    Occurrences of items with `amount_samples` draw from those observed amounts;
+    items with `amount_stddev` draw from a normal distribution around their
+    amount; everything else, including overridden occurrences, is fixed. Each
+    chunk of paths is simulated as a paths x days array, and chunks can be
+    spread over a process pool through `executor`. Chunks are seeded from
+    `seed` independently of how they are scheduled, so results are reproducible.
+
+    Args:
+        paths: Number of simulated paths.
+        percentiles: Percentiles of the daily balance to return.
+        seed: Seed of the random generator (default: unpredictable).
+        chunk_size: Paths simulated per chunk.
+        executor: Optional concurrent.futures executor to run chunks on.
+        (other args as in `run_forecast`)
+    Returns:
+        SimulationResult: Percentile bands and daily breach probability.
+    """
+    today = start_date or datetime.now().date()
+    offsets, cents, events = _expand_events(
+        bills, transactions, today, horizon_days, overrides
+    )
+    items = {
+        (event_type, item.id): item
+        for event_type, item, *_ in _forecast_items(bills, transactions)
+    }
+    overrides = overrides or {}
+    normal, stddevs, empirical = [], [], []
+    for pos, event in enumerate(events):
+        if (event["type"], event["id"], event["date"]) in overrides:
+            continue
+        item = items[(event["type"], event["id"])]
+        sign = -1 if event["type"] == "bill" else 1
+        if item.amount_samples:
+            empirical.append((pos, sign * np.asarray(item.amount_samples, dtype=float)))
+        elif item.amount_stddev:
+            normal.append(pos)
+            stddevs.append(item.amount_stddev)
+
+    # The expected series, with empirical occurrences left out and drawn per path
+    fixed = cents.copy()
+    fixed[[pos for pos, _ in empirical]] = 0
+    deltas = _daily_cents(offsets, fixed, horizon_days)
+    deltas[0] += to_cents(account.current_balance)
+    base = from_cents(np.cumsum(deltas))
+
+    sizes = [min(chunk_size, paths - i) for i in range(0, paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = (
+        base,
+        offsets[normal],
+        np.array(stddevs, dtype=float),
+        [(offsets[pos], values) for pos, values in empirical],
+    )
+    chunks = (executor.map if executor else map)(
+        _simulate_chunk, sizes, seeds, *[[arg] * len(sizes) for arg in args]
+    )
+    series = np.concatenate(list(chunks))
+    bands = np.percentile(series, percentiles, axis=0)
+    return SimulationResult(
+        today,
+        dict(zip(percentiles, bands)),
+        (series < buffer_amount).mean(axis=0),
+        paths,
+    )
+
+
+def _simulate_chunk(paths, seed, base, normal_days, stddevs, empirical):
+    """Simulate `paths` balance paths as a paths x days array."""
+    rng = np.random.default_rng(seed)
+    horizon_days = len(base)
+    days = [normal_days] + [np.full(1, day) for day, _ in empirical]
+    draws = [rng.normal(0.0, stddevs, size=(paths, len(stddevs)))]
+    draws.extend(rng.choice(values, size=(paths, 1)) for _, values in empirical)
+    days = np.concatenate(days).astype(np.int64)
+    draws = np.hstack(draws)
+    # Scatter every path's draws into its own row of per-day deltas
+    rows = np.arange(paths)[:, None] * horizon_days
+    deltas = np.bincount(
+        (rows + days).ravel(), weights=draws.ravel(), minlength=paths * horizon_days
+    ).reshape(paths, horizon_days)
+    return base + np.cumsum(deltas, axis=1)
+
+
+def daily_deltas(bills, transactions, start_date, horizon_days, overrides=None):
+    """
+    Return the net amount the given items add to each day of a window.
+
+    Returns:
+        np.ndarray: One signed total in cents per horizon day, overrides applied.
+    """
+    offsets, cents, _ = _expand_events(
+        bills, transactions, start_date, horizon_days, overrides
+    )
+    return _daily_cents(offsets, cents, horizon_days)
+
+
+def _daily_cents(offsets, cents, horizon_days):
+    """Sum amounts in cents per day offset."""
+    # bincount adds in float64, which is exact for integers below 2**53 cents
+    return np.bincount(offsets, weights=cents, minlength=horizon_days).astype(np.int64)
+
+
+def _expand_events(bills, transactions, today, horizon_days, overrides):
+    """
+    Expand bills and transactions into the date-sorted occurrences of a window.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, List[dict]]: Day offsets, signed amounts in
+            cents and event dicts of the kept occurrences, sorted by day.
+    """
+    end_date = today + timedelta(days=horizon_days - 1)
+    items = _forecast_items(bills, transactions)
+    offsets, index = expand_batch(
+        [(start, rule, end) for _, _, _, start, rule, end in items], today, end_date
+    )
+    signs = np.array([sign for _, _, sign, _, _, _ in items], dtype=np.int64)
+    base_cents = to_cents([item.amount for _, item, _, _, _, _ in items])
+    cents = signs[index] * base_cents[index]
+    keep = _apply_overrides(
+        items, offsets, index, cents, overrides, today, horizon_days
+    )
+    # A stable sort keeps same-day occurrences in item order
+    order = np.flatnonzero(keep)[np.argsort(offsets[keep], kind="stable")]
+    offsets, index, cents = offsets[order], index[order], cents[order]
+
+    events = []
+    for pos in range(len(offsets)):
+        event_type, item, sign, *_ = items[index[pos]]
+        events.append(
+            {
+                "type": event_type,
+                "id": item.id,
+                "name": item.name,
+                "amount": int(sign * cents[pos]) / 100,
+                "date": today + timedelta(days=int(offsets[pos])),
+            }
+        )
+    return offsets, cents, events
 
 
 def forecast_balance(
@@ -23,8 +663,8 @@ def forecast_balance(
     Calculate daily balances for the next `horizon_days` days and alert dates below buffer.
     Args:
         account: Account object with current_balance and id.
-        bills: List of Bill objects for the account.
-        transactions: List of Transaction objects for the account.
+        bills: Bill objects or EventSpecs of the account.
+        transactions: Transaction objects or EventSpecs of the account.
         horizon_days: Number of days to forecast (default: 90).
         buffer_amount: User-configurable buffer threshold.
         db: SQLAlchemy session, required for override logic.
@@ -33,107 +673,59 @@ def forecast_balance(
         List[date]: Dates when balance falls below buffer.
     """
     today = start_date or datetime.now().date()
-    balances = {}
-    # Start with today's balance
-    balances[today] = account.current_balance
-
-    # Collect all events (bills and transactions) by date
-    events = defaultdict(float)
-    end_date = today + timedelta(days=horizon_days - 1)
-
-    # Load overrides if db is provided
-    overrides = {}
+    overrides = None
     if db is not None:
-        override_objs = (
-            db.query(ForecastOverride)
-            .filter(
-                ForecastOverride.account_id == account.id,
-                ForecastOverride.event_date >= today,
-                ForecastOverride.event_date <= end_date,
-            )
-            .all()
-        )
-        for o in override_objs:
-            # Key: (event_type, event_id, event_date)
-            overrides[(o.event_type, o.event_id, o.event_date)] = o
-
-    # Expand and add bills
-    for bill in bills:
-        dates = expand_recurrence(
-            bill.start_date.date(),
-            bill.recurrence,
-            bill.end_date.date() if bill.end_date else end_date,
+        overrides = load_overrides(
+            db, account.id, today, today + timedelta(days=horizon_days - 1)
         )
-        for d in dates:
-            d = d.date() if hasattr(d, "date") else d  # Ensure d is a date
-            if today <= d <= end_date:
-                key = ("bill", bill.id, d)
-                override = overrides.get(key)
-                if override:
-                    if override.skip:
-                        continue  # Skip this event
-                    amount = (
-                        override.override_amount
-                        if override.override_amount is not None
-                        else bill.amount
-                    )
-                else:
-                    amount = bill.amount
-                events[d] -= amount  # Bills are expenses
-
-    # Expand and add transactions
-    for tx in transactions:
-        if tx.is_recurring and tx.recurrence:
-            dates = expand_recurrence(
-                tx.date.date(),
-                tx.recurrence,
-                tx.end_date.date() if tx.end_date else end_date,
-            )
-            for d in dates:
-                d = d.date() if hasattr(d, "date") else d
-                if today <= d <= end_date:
-                    key = ("transaction", tx.id, d)
-                    override = overrides.get(key)
-                    if override:
-                        if override.skip:
-                            continue
-                        amount = (
-                            override.override_amount
-                            if override.override_amount is not None
-                            else tx.amount
-                        )
-                    else:
-                        amount = tx.amount
-                    events[d] += amount
-        else:
-            d = tx.date.date() if hasattr(tx.date, "date") else tx.date
-            if today <= d <= end_date:
-                key = ("transaction", tx.id, d)
-                override = overrides.get(key)
-                if override:
-                    if override.skip:
-                        continue
-                    amount = (
-                        override.override_amount
-                        if override.override_amount is not None
-                        else tx.amount
-                    )
-                else:
-                    amount = tx.amount
-                events[d] += amount
-
-    # Calculate daily balances
-    # Start with today's balance and apply today's events
-    balances[today] = account.current_balance + events[today]
-    last_balance = balances[today]
-    alerts = []
-    if last_balance < buffer_amount:
-        alerts.append(today)
-    for i in range(1, horizon_days):
-        day = today + timedelta(days=i)
-        last_balance += events[day]
-        balances[day] = last_balance
-        if last_balance < buffer_amount:
-            alerts.append(day)
-
-    return balances, alerts
+    result = run_forecast(
+        account, bills, transactions, horizon_days, buffer_amount, overrides, today
+    )
+    return result.balances, result.alerts
+
+
+def _day(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _forecast_items(bills, transactions):
+    """Flatten bills and transactions into (event_type, spec, sign, start, rule, end) tuples."""
+    items = [
+        ("bill", spec, -1, spec.start, spec.rule, spec.end)
+        for spec in map(bill_spec, bills)  # Bills are expenses
+    ]
+    items.extend(
+        ("transaction", spec, 1, spec.start, spec.rule, spec.end)
+        for spec in map(transaction_spec, transactions)
+    )
+    return items
+
+
+def _apply_overrides(items, offsets, index, cents, overrides, today, horizon_days):
+    """
+    Apply per-occurrence overrides in place on `cents`.
+
+    Returns:
+        np.ndarray: Boolean mask of the occurrences that are kept (not skipped).
+    """
+    keep = np.ones(len(offsets), dtype=bool)
+    if not overrides:
+        return keep
+    positions = {}
+    for i, (event_type, item, *_) in enumerate(items):
+        positions.setdefault((event_type, item.id), []).append(i)
+    # Occurrences are sorted by item, then by day, so their keys are ascending
+    keys = index * horizon_days + offsets
+    for (event_type, event_id, event_date), override in overrides.items():
+        offset = (event_date - today).days
+        if not 0 <= offset < horizon_days:
+            continue
+        for i in positions.get((event_type, event_id), ()):
+            pos = np.searchsorted(keys, i * horizon_days + offset)
+            if pos == len(keys) or keys[pos] != i * horizon_days + offset:
+                continue
+            if override.skip:
+                keep[pos] = False  # Skip this event
+            elif override.override_amount is not None:
+                cents[pos] = items[i][2] * to_cents(override.override_amount)
+    return keep
@@ -0,0 +1,341 @@
+"""
+Materialized daily balances.
+
+`forecast_daily_balances` holds the projected balance of an account for every
+day of a window anchored at the day it was built. Reads become range scans,
+and a change to a single bill, transaction, override or account balance only
+patches the affected suffix of the series, inside the same transaction as the
+change itself. Balances are stored as integer cents, so repeated patches add
+exactly. Rows are written with Core statements so they bypass the ORM audit
+listeners.
+
+The store is built by the nightly job (app.core.nightly); reads that miss it
+compute the series without writing. Patches and rebuilds of an account are
+serialized on its `accounts` row, see lock_accounts.
+"""
+
+from datetime import timedelta
+from types import SimpleNamespace
+
+import numpy as np
+from sqlalchemy import (bindparam, delete, event, func, insert, inspect,
+                        select, update)
+from sqlalchemy.orm import Session
+
+from app.core.forecasting import daily_deltas, from_cents, to_cents
+from app.models import (Account, Bill, ForecastDailyBalance, ForecastOverride,
+                        Transaction)
+
+balances_table = ForecastDailyBalance.__table__
+
+
+def read_series(db, account_id, start_date, horizon_days):
+    """
+    Read the materialized balances of an account for a window.
+
+    Returns:
+        np.ndarray | None: One balance in dollars per day, or None when the store
+            does not cover the window or was anchored on an earlier day.
+    """
+    end_date = start_date + timedelta(days=horizon_days - 1)
+    rows = db.execute(
+        select(balances_table.c.day, balances_table.c.balance_cents)
+        .where(
+            balances_table.c.account_id == account_id,
+            # One extra day before the window detects a stale anchor
+            balances_table.c.day >= start_date - timedelta(days=1),
+            balances_table.c.day <= end_date,
+        )
+        .order_by(balances_table.c.day)
+    ).all()
+    if len(rows) != horizon_days or rows[0].day != start_date:
+        return None
+    return from_cents(np.array([row.balance_cents for row in rows], dtype=np.int64))
+
+
+def store_many(db, start_date, series_by_account):
+    """Replace the materialized cents series of several accounts in two statements."""
+    conn = db.connection()
+    conn.execute(
+        delete(balances_table).where(
+            balances_table.c.account_id.in_(list(series_by_account))
+        )
+    )
+    conn.execute(
+        insert(balances_table),
+        [
+            {
+                "account_id": account_id,
+                "day": start_date + timedelta(days=i),
+                "balance_cents": cents,
+            }
+            for account_id, series in series_by_account.items()
+            for i, cents in enumerate(series.tolist())
+        ],
+    )
+
+
+def lock_accounts(db, account_ids):
+    """
+    Lock the rows of the given accounts until the end of the transaction.
+
+    Every writer of the store takes this lock before reading what it writes
+    from: the flush hook before patching, and the nightly job before checking
+    and storing a chunk. A change committed while a chunk is stored then waits
+    for it and patches the rebuilt rows, instead of being patched into rows the
+    rebuild overwrites. Ids are locked in order to avoid deadlocks.
+    """
+    if account_ids:
+        db.execute(
+            select(Account.id)
+            .where(Account.id.in_(sorted(account_ids)))
+            .order_by(Account.id)
+            .with_for_update()
+        )
+
+
+def _windows(conn, account_ids):
+    """Return the (start date, days) of the stored window of each account that has one."""
+    if not account_ids:
+        return {}
+    rows = conn.execute(
+        select(
+            balances_table.c.account_id,
+            func.min(balances_table.c.day),
+            func.max(balances_table.c.day),
+        )
+        .where(balances_table.c.account_id.in_(sorted(account_ids)))
+        .group_by(balances_table.c.account_id)
+    )
+    return {
+        account_id: (start, (end - start).days + 1) for account_id, start, end in rows
+    }
+
+
+def _patch(conn, account_id, start_date, deltas):
+    """Add per-day `deltas` in cents to the series, from the first changed day on."""
+    changed = np.flatnonzero(deltas)
+    if len(changed) == 0:
+        return
+    first = int(changed[0])
+    if len(changed) == 1:
+        conn.execute(
+            update(balances_table)
+            .where(
+                balances_table.c.account_id == account_id,
+                balances_table.c.day >= start_date + timedelta(days=first),
+            )
+            .values(balance_cents=balances_table.c.balance_cents + int(deltas[first]))
+        )
+        return
+    rows = conn.execute(
+        select(balances_table.c.day, balances_table.c.balance_cents)
+        .where(
+            balances_table.c.account_id == account_id,
+            balances_table.c.day >= start_date + timedelta(days=first),
+        )
+        .order_by(balances_table.c.day)
+    ).all()
+    suffix = np.cumsum(deltas)
+    conn.execute(
+        update(balances_table)
+        .where(
+            balances_table.c.account_id == bindparam("a"),
+            balances_table.c.day == bindparam("d"),
+        )
+        .values(balance_cents=bindparam("b")),
+        [
+            {
+                "a": account_id,
+                "d": row.day,
+                "b": row.balance_cents + int(suffix[(row.day - start_date).days]),
+            }
+            for row in rows
+        ],
+    )
+
+
+def _stored(conn, table, ids):
+    """Return the stored rows of `table` with the given ids, by id, in one query."""
+    if not ids:
+        return {}
+    rows = conn.execute(select(table).where(table.c.id.in_(sorted(ids))))
+    return {row.id: SimpleNamespace(**row._mapping) for row in rows}
+
+
+def _pending(obj):
+    """Return the column values of `obj` with its pending changes."""
+    return SimpleNamespace(
+        **{
+            attr.key: getattr(obj, attr.key)
+            for attr in inspect(obj).mapper.column_attrs
+        }
+    )
+
+
+def _stored_overrides(conn, account_ids, items):
+    """Return the stored overrides of the `(event_type, event_id)` items, in one query."""
+    if not account_ids or not items:
+        return []
+    table = ForecastOverride.__table__
+    rows = conn.execute(
+        select(table).where(
+            table.c.account_id.in_(sorted(account_ids)),
+            table.c.event_id.in_(sorted({event_id for _, event_id in items})),
+        )
+    )
+    return [
+        SimpleNamespace(**row._mapping)
+        for row in rows
+        if (row.event_type, row.event_id) in items
+    ]
+
+
+def _event_type(obj):
+    return "bill" if isinstance(obj, Bill) else "transaction"
+
+
+def _invalidate(conn, account_id):
+    conn.execute(
+        delete(balances_table).where(balances_table.c.account_id == account_id)
+    )
+
+
+class _AccountChange:
+    """The items and overrides of one account that a flush touches, before and after."""
+
+    def __init__(self):
+        self.items = {"old": [], "new": []}
+        self.overrides = {"old": {}, "new": {}}
+        self.balance = 0
+
+    def add_item(self, side, event_type, snapshot):
+        if snapshot.deleted_at is None:
+            self.items[side].append((event_type, snapshot))
+
+    def deltas(self, start_date, horizon_days):
+        """Return the change in cents on each day of the window, balance included."""
+        deltas = np.zeros(horizon_days, dtype=np.int64)
+        for side, sign in (("new", 1), ("old", -1)):
+            items = self.items[side]
+            if items:
+                deltas += sign * daily_deltas(
+                    [s for event_type, s in items if event_type == "bill"],
+                    [s for event_type, s in items if event_type == "transaction"],
+                    start_date,
+                    horizon_days,
+                    self.overrides[side],
+                )
+        deltas[0] += self.balance
+        return deltas
+
+
+def _override_key(snapshot):
+    return (snapshot.event_type, snapshot.event_id, snapshot.event_date)
+
+
+def before_flush(session, flush_context, instances):
+    """
+    Patch the stored series of the accounts a flush changes.
+
+    Each account's change is the forecast of the items the flush touches, with
+    their overrides, after the flush minus before it. The "before" side is read
+    from the stored rows and the "after" side from the session, so an item and
+    its overrides changed together are diffed consistently. Stored rows are
+    read with one query per table however many objects change.
+    """
+    changed = [
+        obj
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, (Account, Bill, Transaction, ForecastOverride))
+        and (obj not in session.dirty or session.is_modified(obj))
+    ]
+    if not changed:
+        return
+    with session.no_autoflush:
+        conn = session.connection()
+        old = {}
+        for model in (Account, Bill, Transaction, ForecastOverride):
+            persistent = [
+                obj
+                for obj in changed
+                if isinstance(obj, model) and obj not in session.new
+            ]
+            rows = _stored(
+                conn, model.__table__, [inspect(o).identity[0] for o in persistent]
+            )
+            for obj in persistent:
+                old[obj] = rows.get(inspect(obj).identity[0])
+        new = {
+            obj: None if obj in session.deleted else _pending(obj) for obj in changed
+        }
+
+        account_ids, touched, targets = set(), set(), set()
+        for obj in changed:
+            snapshots = [s for s in (old.get(obj), new[obj]) if s is not None]
+            if isinstance(obj, Account):
+                account_ids.update(s.id for s in snapshots if obj not in session.new)
+                continue
+            account_ids.update(s.account_id for s in snapshots)
+            if isinstance(obj, ForecastOverride):
+                targets.update((s.event_type, s.event_id) for s in snapshots)
+            elif obj not in session.new:
+                touched.add((_event_type(obj), inspect(obj).identity[0]))
+        lock_accounts(conn, account_ids)
+        windows = _windows(conn, account_ids)
+        if not windows:
+            return
+
+        changes = {account_id: _AccountChange() for account_id in windows}
+        for obj in changed:
+            if isinstance(obj, Account):
+                if old.get(obj) is None or obj.id not in changes:
+                    continue
+                # A deleted account, hard or soft, has no forecast to keep
+                if new[obj] is None or new[obj].deleted_at is not None:
+                    _invalidate(conn, obj.id)
+                    del changes[obj.id]
+                    continue
+                changes[obj.id].balance += int(
+                    to_cents(new[obj].current_balance or 0.0)
+                ) - int(to_cents(old[obj].current_balance or 0.0))
+            elif not isinstance(obj, ForecastOverride):
+                for side, snapshot in (("old", old.get(obj)), ("new", new[obj])):
+                    if snapshot is not None and snapshot.account_id in changes:
+                        changes[snapshot.account_id].add_item(
+                            side, _event_type(obj), snapshot
+                        )
+
+        # Items whose overrides change count on both sides, unchanged themselves
+        for event_type, model in (("bill", Bill), ("transaction", Transaction)):
+            ids = {i for t, i in targets - touched if t == event_type}
+            for row in _stored(conn, model.__table__, ids).values():
+                if row.account_id in changes:
+                    for side in ("old", "new"):
+                        changes[row.account_id].add_item(side, event_type, row)
+
+        # Overrides as stored, then with the pending ones applied
+        for row in _stored_overrides(conn, set(changes), touched | targets):
+            for side in ("old", "new"):
+                changes[row.account_id].overrides[side][_override_key(row)] = row
+        for obj in changed:
+            if not isinstance(obj, ForecastOverride):
+                continue
+            if old.get(obj) is not None and old[obj].account_id in changes:
+                changes[old[obj].account_id].overrides["new"].pop(
+                    _override_key(old[obj]), None
+                )
+            if new[obj] is not None and new[obj].account_id in changes:
+                changes[new[obj].account_id].overrides["new"][
+                    _override_key(new[obj])
+                ] = new[obj]
+
+        for account_id, change in changes.items():
+            start_date, horizon_days = windows[account_id]
+            _patch(
+                conn, account_id, start_date, change.deltas(start_date, horizon_days)
+            )
+
+
+def register_materialized_listeners():
+    event.listen(Session, "before_flush", before_flush)
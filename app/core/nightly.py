@@ -0,0 +1,194 @@
+"""
+Nightly forecast job.
+
+Recomputes the materialized daily balances of every active account. Accounts
+are streamed from the database in chunks, the bills, transactions and
+overrides of each chunk are bulk-loaded as specs with column-only queries, and the
+forecasts run on a process pool while the next chunk loads. Before a chunk is
+stored its accounts are locked and its inputs reloaded, and the accounts that
+changed while it was computing are forecast again.
+
+Usage:
+    python app/core/nightly.py --workers 4 --chunk-size 500
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.forecasting import run_forecast
+from app.core.materialized import lock_accounts, store_many
+from app.core.seed import wait_for_db
+from app.core.specs import (AccountSpec, load_account_specs, load_event_specs,
+                            load_override_specs)
+from app.models import Account
+
+
+def iter_account_chunks(db: Session, chunk_size):
+    """Yield the AccountSpecs of active accounts, `chunk_size` at a time."""
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Account.id, Account.current_balance)
+            .where(Account.deleted_at.is_(None), Account.id > last_id)
+            .order_by(Account.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            return
+        yield [AccountSpec(id, balance or 0.0) for id, balance in rows]
+        last_id = rows[-1].id
+
+
+def load_chunk(db: Session, accounts, start_date, horizon_days):
+    """
+    Bulk-load everything needed to forecast a chunk of accounts.
+
+    Returns:
+        List[tuple]: Picklable (account, bills, transactions, overrides) jobs.
+    """
+    ids = [account.id for account in accounts]
+    end_date = start_date + timedelta(days=horizon_days - 1)
+    bills, transactions = load_event_specs(db, ids)
+    overrides = load_override_specs(db, ids, start_date, end_date)
+    return [
+        (account, bills[account.id], transactions[account.id], overrides[account.id])
+        for account in accounts
+    ]
+
+
+def forecast_chunk(jobs, start_date, horizon_days):
+    """Forecast a chunk of accounts into cents series; runs in a worker process."""
+    return {
+        account.id: run_forecast(
+            account,
+            bills,
+            transactions,
+            horizon_days,
+            overrides=overrides,
+            start_date=start_date,
+        ).cents
+        for account, bills, transactions, overrides in jobs
+    }
+
+
+def store_chunk(db: Session, jobs, results, start_date, horizon_days):
+    """
+    Store the forecasts of a chunk and commit.
+
+    The chunk's accounts are locked and its inputs reloaded first. Accounts
+    whose inputs changed since `jobs` were loaded are forecast again, and
+    accounts deleted since are not stored.
+
+    Returns:
+        int: Number of accounts stored.
+    """
+    ids = [account.id for account, *_ in jobs]
+    lock_accounts(db, ids)
+    current = load_chunk(
+        db, load_account_specs(db, account_ids=ids), start_date, horizon_days
+    )
+    loaded = {job[0].id: job for job in jobs}
+    changed = [job for job in current if loaded[job[0].id] != job]
+    results = {**results, **forecast_chunk(changed, start_date, horizon_days)}
+    results = {job[0].id: results[job[0].id] for job in current}
+    if results:
+        store_many(db, start_date, results)
+    db.commit()
+    return len(results)
+
+
+def run_nightly(
+    db: Session,
+    workers=0,
+    chunk_size=500,
+    horizon_days=None,
+    start_date=None,
+):
+    """
+    Recompute and store the daily balances of every active account.
+
+    Args:
+        db: SQLAlchemy session.
+        workers: Worker processes for the forecasts; 0 runs them inline.
+        chunk_size: Accounts loaded, forecast and written together.
+        horizon_days: Days to materialize (default: MATERIALIZED_HORIZON_DAYS).
+        start_date: First day of the forecasts (default: today).
+    Returns:
+        dict: Number of accounts, elapsed seconds and accounts per second.
+    """
+    horizon_days = horizon_days or settings.MATERIALIZED_HORIZON_DAYS
+    today = start_date or datetime.now().date()
+    started = time.perf_counter()
+    count = 0
+
+    if workers <= 0:
+        for accounts in iter_account_chunks(db, chunk_size):
+            jobs = load_chunk(db, accounts, today, horizon_days)
+            results = forecast_chunk(jobs, today, horizon_days)
+            count += store_chunk(db, jobs, results, today, horizon_days)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Keep the pool busy while bounding the chunks held in memory
+            pending = {}
+            for accounts in iter_account_chunks(db, chunk_size):
+                jobs = load_chunk(db, accounts, today, horizon_days)
+                future = executor.submit(forecast_chunk, jobs, today, horizon_days)
+                pending[future] = jobs
+                if len(pending) >= 2 * workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        jobs = pending.pop(future)
+                        count += store_chunk(
+                            db, jobs, future.result(), today, horizon_days
+                        )
+            for future, jobs in pending.items():
+                count += store_chunk(db, jobs, future.result(), today, horizon_days)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "accounts": count,
+        "seconds": elapsed,
+        "accounts_per_second": count / elapsed if elapsed else 0.0,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Recompute every account forecast")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes, 0 runs inline (default: CPU count)",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=500, help="Accounts per chunk"
+    )
+    parser.add_argument(
+        "--horizon-days",
+        type=int,
+        default=settings.MATERIALIZED_HORIZON_DAYS,
+        help="Days to materialize",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    wait_for_db(engine)
+    db: Session = SessionLocal()
+    try:
+        stats = run_nightly(db, args.workers, args.chunk_size, args.horizon_days)
+    finally:
+        db.close()
+    print(
+        f"Forecast {stats['accounts']} accounts in {stats['seconds']:.1f}s "
+        f"({stats['accounts_per_second']:.1f} accounts/sec)."
+    )
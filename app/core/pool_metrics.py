@@ -0,0 +1,75 @@
+"""
+Connection pool instrumentation.
+
+The engines are built on these pool classes, which time every checkout. Under
+burst load, pool starvation shows up here as growing wait times and checkout
+timeouts, separately from query time.
+"""
+
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class _TimedCheckout:
+    """Pool mixin counting checkouts, timeouts and the time spent waiting."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self):
+        # Includes opening an overflow connection when the pool grows
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._metrics_lock:
+                self.checkouts += 1
+                self.timeouts += timed_out
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_stats(pool):
+    """Return the occupancy and checkout wait statistics of a pool."""
+    if not isinstance(pool, QueuePool):
+        return {"class": type(pool).__name__}
+    stats = {
+        "class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+    if isinstance(pool, _TimedCheckout):
+        with pool._metrics_lock:
+            stats.update(
+                checkouts=pool.checkouts,
+                timeouts=pool.timeouts,
+                wait_seconds_total=pool.wait_seconds,
+                wait_seconds_max=pool.max_wait_seconds,
+                wait_seconds_avg=(
+                    pool.wait_seconds / pool.checkouts if pool.checkouts else 0.0
+                ),
+            )
+    return stats
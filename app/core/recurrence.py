@@ -1,11 +1,27 @@
 """
 Recurrence logic for bills and transactions.
 
-Provides a function to expand recurring events into individual dates using dateutil.rrule.
+Provides a lazy generator that streams the occurrence dates of a recurring event,
+jumping straight to the first occurrence of a date window, plus list-returning
+helpers built on top of it. Windowed expansions are memoized process-wide in a
+bounded LRU cache keyed on the normalized rule and window.
+
+A recurrence is either one of the keywords in `FREQ_MAP` or an RFC 5545 RRULE
+string such as "FREQ=WEEKLY;INTERVAL=2;BYDAY=FR" or "FREQ=MONTHLY;BYMONTHDAY=15,-1".
+Every distinct rule string is parsed once by `compile_rule` and cached.
 """
 
+import calendar
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
 from dateutil.relativedelta import relativedelta
-from dateutil.rrule import DAILY, MONTHLY, WEEKLY, YEARLY, rrule
+from dateutil.rrule import (DAILY, FR, MO, MONTHLY, SA, SU, TH, TU, WE, WEEKLY,
+                            YEARLY, rrule)
+
+from app.core.config import settings
 
 FREQ_MAP = {
     "DAILY": DAILY,
@@ -15,6 +31,358 @@ FREQ_MAP = {
     "EOM": MONTHLY,  # EOM handled specially below
 }
 
+WEEKDAY_MAP = {"MO": MO, "TU": TU, "WE": WE, "TH": TH, "FR": FR, "SA": SA, "SU": SU}
+
+# RRULE parts mapped to the rrule() keyword they compile to
+BY_PARTS = {
+    "BYMONTH": "bymonth",
+    "BYMONTHDAY": "bymonthday",
+    "BYDAY": "byweekday",
+    "BYSETPOS": "bysetpos",
+    "BYYEARDAY": "byyearday",
+    "BYWEEKNO": "byweekno",
+}
+
+_BYDAY_RE = re.compile(r"^([+-]?\d{1,2})?(MO|TU|WE|TH|FR|SA|SU)$")
+
+
+def _as_date(d):
+    return d.date() if hasattr(d, "date") else d
+
+
+def _as_datetime(d):
+    return d if isinstance(d, datetime) else datetime.combine(d, datetime.min.time())
+
+
+def _month_slot(start_date, n, day=None):
+    """Return `start_date` moved `n` months forward on `day`, or None if that day does not exist."""
+    month_index = start_date.month - 1 + n
+    year, month = start_date.year + month_index // 12, month_index % 12 + 1
+    last_day = calendar.monthrange(year, month)[1]
+    if day is None:
+        day = last_day
+    elif day > last_day:
+        return None
+    return start_date.replace(year=year, month=month, day=day)
+
+
+def _slot(start_date, rule, n):
+    """Return the n-th candidate occurrence of `rule`, or None if that slot is skipped."""
+    if rule == "DAILY":
+        return start_date + timedelta(days=n)
+    if rule == "WEEKLY":
+        return start_date + timedelta(weeks=n)
+    if rule == "MONTHLY":
+        return _month_slot(start_date, n, start_date.day)
+    if rule == "EOM":
+        return _month_slot(start_date, n)
+    # YEARLY: Feb 29 only exists in leap years
+    year = start_date.year + n
+    if start_date.month == 2 and start_date.day == 29 and not calendar.isleap(year):
+        return None
+    return start_date.replace(year=year)
+
+
+def _first_slot(start_date, rule, window_start):
+    """Return the index of the first slot that can fall on or after `window_start`."""
+    start = _as_date(start_date)
+    if window_start <= start:
+        return 0
+    if rule == "DAILY":
+        return (window_start - start).days
+    if rule == "WEEKLY":
+        return -(-(window_start - start).days // 7)
+    if rule in ("MONTHLY", "EOM"):
+        return (window_start.year - start.year) * 12 + window_start.month - start.month
+    return window_start.year - start.year
+
+
+def _parse_int_list(name, value, low, high):
+    values = []
+    for item in value.split(","):
+        try:
+            number = int(item)
+        except ValueError:
+            raise ValueError(f"Invalid {name} value: {item!r}") from None
+        if number == 0 or not low <= abs(number) <= high:
+            raise ValueError(f"Invalid {name} value: {item!r}")
+        values.append(number)
+    return tuple(values)
+
+
+def _parse_positive_int(name, value):
+    if not value.isdigit() or int(value) < 1:
+        raise ValueError(f"Invalid {name} value: {value!r}")
+    return int(value)
+
+
+def _parse_byday(value):
+    weekdays = []
+    for item in value.split(","):
+        match = _BYDAY_RE.match(item)
+        if not match:
+            raise ValueError(f"Invalid BYDAY value: {item!r}")
+        nth, day = match.groups()
+        weekdays.append(WEEKDAY_MAP[day](int(nth)) if nth else WEEKDAY_MAP[day])
+    return tuple(weekdays)
+
+
+def _parse_until(value):
+    for fmt in ("%Y%m%d", "%Y%m%dT%H%M%S", "%Y%m%dT%H%M%SZ"):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid UNTIL value: {value!r}")
+
+
+class CompiledRule:
+    """
+    A recurrence rule parsed once and reused for every expansion.
+
+    Keyword rules, and RRULEs equivalent to them (a bare FREQ with an optional
+    INTERVAL, or FREQ=MONTHLY;BYMONTHDAY=-1 for EOM), use the closed-form path
+    that computes the first occurrence of a window arithmetically. Other RRULEs
+    are expanded by dateutil's rrule, rebased to the period containing the
+    window start whenever the rule has no COUNT.
+    """
+
+    __slots__ = ("text", "keyword", "freq", "interval", "count", "until", "by", "wkst")
+
+    def __init__(
+        self,
+        text,
+        freq,
+        keyword=None,
+        interval=1,
+        count=None,
+        until=None,
+        by=None,
+        wkst=None,
+    ):
+        self.text = text
+        self.freq = freq
+        self.keyword = keyword
+        self.interval = interval
+        self.count = count
+        self.until = until
+        self.by = by or {}
+        self.wkst = wkst
+
+    def __repr__(self):
+        return f"CompiledRule({self.text!r})"
+
+    def occurrences(self, start_date, end_date=None, window_start=None):
+        """Yield occurrences from `start_date`, bounded by calendar dates like `iter_recurrence`."""
+        end = _as_date(end_date) if end_date else None
+        if self.until and (end is None or self.until < end):
+            end = self.until
+        first = _as_date(window_start) if window_start else _as_date(start_date)
+        if self.keyword and (self.count is None or self.keyword in ("DAILY", "WEEKLY")):
+            return self._closed_form(start_date, end, first)
+        return self._expand(start_date, end, first)
+
+    def _closed_form(self, start_date, end, first):
+        n = -(-_first_slot(start_date, self.keyword, first) // self.interval)
+        while self.count is None or n < self.count:
+            occurrence = _slot(start_date, self.keyword, n * self.interval)
+            n += 1
+            if occurrence is None:
+                continue
+            d = _as_date(occurrence)
+            if end is not None and d > end:
+                return
+            if d >= first:
+                yield occurrence
+
+    def _defaults(self, dtstart):
+        """Make the by-parts rrule() derives from dtstart explicit, so dtstart can move."""
+        by = dict(self.by)
+        if not any(
+            k in by for k in ("byweekno", "byyearday", "bymonthday", "byweekday")
+        ):
+            if self.freq == YEARLY:
+                by.setdefault("bymonth", dtstart.month)
+                by["bymonthday"] = dtstart.day
+            elif self.freq == MONTHLY:
+                by["bymonthday"] = dtstart.day
+            elif self.freq == WEEKLY:
+                by["byweekday"] = dtstart.weekday()
+        return by
+
+    def _rebase(self, dtstart, first):
+        """Return the start of the last period, aligned on INTERVAL, that begins on or before `first`."""
+        start = dtstart.date()
+        if self.freq == DAILY:
+            periods = (first - start).days // self.interval
+            return dtstart + timedelta(days=periods * self.interval)
+        if self.freq == WEEKLY:
+            week_start = start - timedelta(
+                days=(start.weekday() - (self.wkst or 0)) % 7
+            )
+            periods = (first - week_start).days // 7 // self.interval
+            if periods <= 0:
+                return dtstart
+            return datetime.combine(
+                week_start + timedelta(weeks=periods * self.interval), dtstart.time()
+            )
+        if self.freq == MONTHLY:
+            months = (first.year - start.year) * 12 + first.month - start.month
+            periods = months // self.interval
+            if periods <= 0:
+                return dtstart
+            return dtstart.replace(day=1) + relativedelta(
+                months=periods * self.interval
+            )
+        periods = (first.year - start.year) // self.interval
+        if periods <= 0:
+            return dtstart
+        return dtstart.replace(
+            year=start.year + periods * self.interval, month=1, day=1
+        )
+
+    def _expand(self, start_date, end, first):
+        dtstart = _as_datetime(start_date)
+        by = self._defaults(dtstart)
+        if self.count is None and first > dtstart.date():
+            dtstart = self._rebase(dtstart, first)
+        rule = rrule(
+            self.freq,
+            dtstart=dtstart,
+            interval=self.interval,
+            count=self.count,
+            wkst=self.wkst,
+            **by,
+        )
+        start = _as_date(start_date)
+        for occurrence in rule:
+            d = occurrence.date()
+            if end is not None and d > end:
+                return
+            if d >= first and d >= start:
+                yield occurrence if isinstance(start_date, datetime) else d
+
+
+@lru_cache(maxsize=1024)
+def compile_rule(recurrence_rule):
+    """
+    Parse a recurrence keyword or RRULE string into a cached `CompiledRule`.
+
+    Args:
+        recurrence_rule (str): e.g. "MONTHLY", "EOM" or "FREQ=WEEKLY;INTERVAL=2;BYDAY=FR".
+
+    Returns:
+        CompiledRule: The parsed rule; `text` holds its normalized form.
+
+    Raises:
+        ValueError: If the rule is not a supported keyword or a valid RRULE.
+    """
+    text = recurrence_rule.strip().upper()
+    text = text.removeprefix("RRULE:")
+    if text in FREQ_MAP:
+        return CompiledRule(text, FREQ_MAP[text], keyword=text)
+    if "=" not in text:
+        raise ValueError(f"Unsupported recurrence rule: {recurrence_rule}")
+
+    parts = {}
+    for item in filter(None, text.split(";")):
+        name, _, value = item.partition("=")
+        if name in parts or not value:
+            raise ValueError(f"Invalid recurrence rule: {recurrence_rule}")
+        parts[name] = value
+
+    freq_name = parts.pop("FREQ", None)
+    if freq_name not in ("DAILY", "WEEKLY", "MONTHLY", "YEARLY"):
+        raise ValueError(f"Unsupported recurrence frequency: {freq_name}")
+    interval = _parse_positive_int("INTERVAL", parts.pop("INTERVAL", "1"))
+    count = parts.pop("COUNT", None)
+    count = _parse_positive_int("COUNT", count) if count else None
+    until = parts.pop("UNTIL", None)
+    until = _parse_until(until) if until else None
+    if count and until:
+        raise ValueError("COUNT and UNTIL cannot be combined")
+    wkst = parts.pop("WKST", None)
+    if wkst is not None and wkst not in WEEKDAY_MAP:
+        raise ValueError(f"Invalid WKST value: {wkst!r}")
+
+    by = {}
+    for name, value in parts.items():
+        if name not in BY_PARTS:
+            raise ValueError(f"Unsupported recurrence rule part: {name}")
+        if name == "BYDAY":
+            by["byweekday"] = _parse_byday(value)
+        elif name == "BYMONTH":
+            by["bymonth"] = _parse_int_list(name, value, 1, 12)
+        elif name == "BYMONTHDAY":
+            by["bymonthday"] = _parse_int_list(name, value, 1, 31)
+        elif name == "BYYEARDAY":
+            by["byyearday"] = _parse_int_list(name, value, 1, 366)
+        elif name == "BYWEEKNO":
+            by["byweekno"] = _parse_int_list(name, value, 1, 53)
+        else:
+            by["bysetpos"] = _parse_int_list(name, value, 1, 366)
+
+    normalized = [f"FREQ={freq_name}"]
+    if interval > 1:
+        normalized.append(f"INTERVAL={interval}")
+    if count:
+        normalized.append(f"COUNT={count}")
+    if until:
+        normalized.append(f"UNTIL={until:%Y%m%d}")
+    if wkst:
+        normalized.append(f"WKST={wkst}")
+    normalized.extend(f"{name}={parts[name]}" for name in sorted(parts))
+    freq = FREQ_MAP[freq_name]
+    wkst = WEEKDAY_MAP[wkst].weekday if wkst else None
+
+    keyword = None
+    if not by:
+        keyword = freq_name
+    elif freq == MONTHLY and by == {"bymonthday": (-1,)}:
+        keyword = "EOM"
+    compiled = CompiledRule(
+        ";".join(normalized), freq, keyword, interval, count, until, by, wkst
+    )
+    # Let dateutil reject invalid by-part values up front
+    rrule(freq, dtstart=datetime(2000, 1, 1), interval=interval, wkst=wkst, **by)
+    return compiled
+
+
+def iter_recurrence(start_date, recurrence_rule, end_date=None, window_start=None):
+    """
+    Lazily yield the occurrence dates of a recurring event.
+
+    Occurrences are produced one at a time, so a caller that stops consuming
+    stops the computation, and an open-ended recurrence (no `end_date`) never
+    materializes more dates than are read. When `window_start` is given, the
+    first occurrence on or after it is computed arithmetically instead of
+    walking forward from `start_date`.
+
+    Args:
+        start_date (date | datetime): The first occurrence date (user-specified).
+        recurrence_rule (str): Recurrence keyword or RRULE, e.g., "MONTHLY", "EOM",
+            "FREQ=WEEKLY;INTERVAL=2;BYDAY=FR".
+        end_date (date | datetime, optional): The last possible occurrence date.
+        window_start (date | datetime, optional): Skip occurrences before this date.
+
+    Yields:
+        date | datetime: Occurrences in order, same type as `start_date`.
+            Bounds are compared by calendar date.
+
+    Examples:
+        next(iter_recurrence(date(2012, 3, 1), "MONTHLY", window_start=date(2024, 6, 2)))
+    """
+    if recurrence_rule:
+        rule = compile_rule(recurrence_rule)
+        yield from rule.occurrences(start_date, end_date, window_start)
+        return
+
+    first = _as_date(window_start) if window_start else _as_date(start_date)
+    if first <= _as_date(start_date) and (
+        end_date is None or _as_date(start_date) <= _as_date(end_date)
+    ):
+        yield start_date
+
 
 def expand_recurrence(start_date, recurrence_rule, end_date=None):
     """
@@ -23,7 +391,9 @@ def expand_recurrence(start_date, recurrence_rule, end_date=None):
     Args:
         start_date (datetime): The first occurrence date (user-specified).
         recurrence_rule (str): Recurrence pattern, e.g., "MONTHLY", "EOM".
-        end_date (datetime, optional): The last possible occurrence date (user-specified).
+        end_date (datetime): The last possible occurrence date (user-specified).
+            Required for recurring events; use `iter_recurrence` to stream an
+            open-ended recurrence.
 
     Returns:
         List[datetime]: List of occurrence datetimes.
@@ -34,24 +404,111 @@ def expand_recurrence(start_date, recurrence_rule, end_date=None):
     """
     if not recurrence_rule:
         return [start_date]
+    if end_date is None:
+        raise ValueError("end_date is required to expand a recurring event")
+    return list(iter_recurrence(start_date, recurrence_rule, end_date))
+
+
+def expand_recurrence_window(start_date, recurrence_rule, window_start, window_end):
+    """
+    Expand a recurring event, keeping only the occurrences between two dates.
+
+    The first in-window occurrence is computed arithmetically instead of walking
+    forward from `start_date`, so the cost is proportional to the number of
+    occurrences in the window, not to the age of the recurrence.
+
+    Args:
+        start_date (date | datetime): The first occurrence date (user-specified).
+        recurrence_rule (str): Recurrence pattern, e.g., "MONTHLY", "EOM".
+        window_start (date): First date of the window (inclusive).
+        window_end (date): Last date of the window (inclusive), usually the earlier
+            of the forecast end and the event's own end date.
+
+    Returns:
+        List[date | datetime]: Occurrences inside the window, same type as `start_date`.
+
+    Examples:
+        expand_recurrence_window(date(2012, 3, 1), "MONTHLY", date(2024, 6, 1), date(2024, 8, 31))
+    """
+    return list(iter_recurrence(start_date, recurrence_rule, window_end, window_start))
+
+
+@lru_cache(maxsize=settings.RECURRENCE_CACHE_SIZE)
+def _cached_window(start_date, rule, window_start, window_end):
+    return tuple(iter_recurrence(start_date, rule, window_end, window_start))
+
+
+def recurrence_window(start_date, recurrence_rule, window_start, window_end):
+    """
+    Memoized version of `expand_recurrence_window` for forecasting.
+
+    Results are cached in a process-wide LRU keyed on the start date, the
+    normalized rule and the window, so the same bill expanded by `/forecast`
+    and `/alerts` is only computed once per window.
+
+    Returns:
+        Tuple[date]: Occurrences inside the window, as dates.
+    """
+    rule = compile_rule(recurrence_rule).text if recurrence_rule else None
+    return _cached_window(
+        _as_date(start_date), rule, _as_date(window_start), _as_date(window_end)
+    )
+
+
+def expand_batch(specs, window_start, window_end):
+    """
+    Expand many recurring events at once into flat NumPy arrays.
+
+    Args:
+        specs (Iterable[tuple]): `(start_date, recurrence_rule, end_date)` triples;
+            `end_date` may be None for open-ended recurrences.
+        window_start (date): First date of the window (inclusive).
+        window_end (date): Last date of the window (inclusive).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Day offsets of every occurrence relative to
+            `window_start`, and a parallel array with the position of the spec
+            each occurrence came from. Offsets are ascending within each spec.
+
+    Examples:
+        offsets, index = expand_batch(
+            [(date(2024, 1, 1), "WEEKLY", None), (date(2024, 1, 3), None, None)],
+            date(2024, 1, 1),
+            date(2024, 1, 14),
+        )
+        # offsets -> [0, 7, 2], index -> [0, 0, 1]
+    """
+    window_start, window_end = _as_date(window_start), _as_date(window_end)
+    chunks = []
+    for start_date, recurrence_rule, end_date in specs:
+        stop = min(_as_date(end_date), window_end) if end_date else window_end
+        chunks.append(
+            recurrence_window(start_date, recurrence_rule, window_start, stop)
+        )
+    lengths = np.fromiter(map(len, chunks), dtype=np.intp, count=len(chunks))
+    dates = np.array(
+        [d for chunk in chunks for d in chunk], dtype="datetime64[D]"
+    ).reshape(-1)
+    offsets = (dates - np.datetime64(window_start, "D")).astype(np.int64)
+    index = np.repeat(np.arange(len(chunks), dtype=np.intp), lengths)
+    return offsets, index
+
+
+def recurrence_cache_stats():
+    """Return hit/miss counters and occupancy of the recurrence cache."""
+    info = _cached_window.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+        "hit_ratio": info.hits / lookups if lookups else 0.0,
+        "compiled_rules": compile_rule.cache_info().currsize,
+    }
 
-    freq = FREQ_MAP.get(recurrence_rule.upper())
-    if freq is None:
-        raise ValueError(f"Unsupported recurrence rule: {recurrence_rule}")
 
-    if recurrence_rule.upper() == "EOM":
-        # End of month: generate monthly, then adjust to last day of each month
-        occurrences = []
-        current = start_date
-        while not end_date or current <= end_date:
-            # Move to last day of the month
-            next_month = current.replace(day=28) + relativedelta(days=4)
-            last_day = next_month - relativedelta(days=next_month.day)
-            occurrences.append(last_day)
-            current = last_day + relativedelta(months=1)
-            if end_date and current > end_date:
-                break
-        return [dt for dt in occurrences if not end_date or dt <= end_date]
-
-    rule = rrule(freq, dtstart=start_date, until=end_date)
-    return list(rule)
+def clear_recurrence_cache():
+    """Drop every cached expansion and reset the counters."""
+    _cached_window.cache_clear()
+    compile_rule.cache_clear()
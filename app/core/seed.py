@@ -2,11 +2,13 @@ import time
 from datetime import datetime
 
 import yaml
+from alembic import command
+from alembic.config import Config
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
 from app import models  # noqa: F401
-from app.core.database import Base, SessionLocal, engine
+from app.core.database import SessionLocal, engine
 from app.core.security import get_password_hash
 from app.models import Account, Bill, Transaction, User, UserSettings
 
@@ -104,6 +106,11 @@ def wait_for_db(engine, timeout=30):
             time.sleep(1)
 
 
+def migrate_database(revision="head"):
+    """Bring the schema up to `revision` with the Alembic migrations."""
+    command.upgrade(Config("alembic.ini"), revision)
+
+
 def load_yaml_data(filepath):
     with open(filepath, "r") as f:
         return yaml.safe_load(f)
@@ -113,7 +120,7 @@ if __name__ == "__main__":
     import sys
 
     wait_for_db(engine)
-    Base.metadata.create_all(bind=engine)
+    migrate_database()
     db: Session = SessionLocal()
     data_file = "seed_data.yaml"
     if len(sys.argv) == 2:
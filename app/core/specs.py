@@ -0,0 +1,189 @@
+"""
+Lightweight forecasting inputs.
+
+The forecast engine only needs a handful of columns per account, bill,
+transaction and override. These named tuples carry exactly those columns:
+they are loaded with column-only queries (no identity map, no attribute
+instrumentation), take a fraction of the memory of ORM instances, and pickle
+cleanly for process pools and caches.
+"""
+
+from datetime import date, datetime
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import literal, select, union_all
+
+from app.models import Account, Bill, ForecastOverride, Transaction
+
+
+class AccountSpec(NamedTuple):
+    id: int
+    current_balance: float
+
+
+class EventSpec(NamedTuple):
+    """
+    A bill or transaction as the engine sees it.
+
+    `rule` is None for one-off events, including non-recurring transactions
+    that carry a recurrence string. Amounts are magnitudes; the sign comes
+    from whether the spec is passed as a bill or a transaction.
+    """
+
+    id: int
+    amount: float
+    start: datetime
+    end: Optional[datetime] = None
+    rule: Optional[str] = None
+    name: Optional[str] = None
+    amount_stddev: Optional[float] = None
+    amount_samples: Optional[List[float]] = None
+
+
+class OverrideSpec(NamedTuple):
+    skip: bool
+    override_amount: Optional[float] = None
+
+
+def bill_spec(bill):
+    """Return the EventSpec of a Bill (or any object with its columns)."""
+    if isinstance(bill, EventSpec):
+        return bill
+    return EventSpec(
+        bill.id,
+        bill.amount,
+        bill.start_date,
+        bill.end_date,
+        bill.recurrence,
+        getattr(bill, "name", None),
+        getattr(bill, "amount_stddev", None),
+        getattr(bill, "amount_samples", None),
+    )
+
+
+def transaction_spec(tx):
+    """Return the EventSpec of a Transaction (or any object with its columns)."""
+    if isinstance(tx, EventSpec):
+        return tx
+    return EventSpec(
+        tx.id,
+        tx.amount,
+        tx.date,
+        tx.end_date,
+        tx.recurrence if tx.is_recurring else None,
+        getattr(tx, "name", None),
+        getattr(tx, "amount_stddev", None),
+        getattr(tx, "amount_samples", None),
+    )
+
+
+def load_event_specs(db, account_ids):
+    """
+    Load the active bills and transactions of accounts with one column-only query.
+
+    Both tables are projected onto the EventSpec columns and read with a single
+    UNION ALL, ordered by id so same-day events keep a stable order.
+
+    Returns:
+        Dict[int, List[EventSpec]], Dict[int, List[EventSpec]]: Bill and transaction
+            specs per account id.
+    """
+    bills = {account_id: [] for account_id in account_ids}
+    transactions = {account_id: [] for account_id in account_ids}
+    if not account_ids:
+        return bills, transactions
+    query = union_all(
+        select(
+            literal("bill").label("kind"),
+            Bill.account_id,
+            Bill.id,
+            Bill.amount,
+            Bill.start_date.label("start"),
+            Bill.end_date,
+            literal(True).label("is_recurring"),
+            Bill.recurrence,
+            Bill.name,
+            Bill.amount_stddev,
+            Bill.amount_samples,
+        ).where(Bill.account_id.in_(account_ids), Bill.deleted_at.is_(None)),
+        select(
+            literal("transaction").label("kind"),
+            Transaction.account_id,
+            Transaction.id,
+            Transaction.amount,
+            Transaction.date.label("start"),
+            Transaction.end_date,
+            Transaction.is_recurring,
+            Transaction.recurrence,
+            Transaction.name,
+            Transaction.amount_stddev,
+            Transaction.amount_samples,
+        ).where(
+            Transaction.account_id.in_(account_ids),
+            Transaction.deleted_at.is_(None),
+        ),
+    )
+    query = query.order_by(query.selected_columns.id)
+    for (
+        kind,
+        account_id,
+        id,
+        amount,
+        start,
+        end,
+        is_recurring,
+        rule,
+        *rest,
+    ) in db.execute(query):
+        specs = bills if kind == "bill" else transactions
+        specs[account_id].append(
+            EventSpec(id, amount, start, end, rule if is_recurring else None, *rest)
+        )
+    return bills, transactions
+
+
+def load_override_specs(db, account_ids, start_date: date, end_date: date):
+    """
+    Load the overrides of accounts inside a window with one column-only query.
+
+    Returns:
+        Dict[int, Dict[tuple, OverrideSpec]]: Per-account overrides keyed by
+            (event_type, event_id, event_date).
+    """
+    overrides = {account_id: {} for account_id in account_ids}
+    if not account_ids:
+        return overrides
+    rows = db.execute(
+        select(
+            ForecastOverride.account_id,
+            ForecastOverride.event_type,
+            ForecastOverride.event_id,
+            ForecastOverride.event_date,
+            ForecastOverride.skip,
+            ForecastOverride.override_amount,
+        ).where(
+            ForecastOverride.account_id.in_(account_ids),
+            ForecastOverride.event_date >= start_date,
+            ForecastOverride.event_date <= end_date,
+        )
+    )
+    for account_id, event_type, event_id, event_date, skip, amount in rows:
+        overrides[account_id][(event_type, event_id, event_date)] = OverrideSpec(
+            bool(skip), amount
+        )
+    return overrides
+
+
+def load_account_specs(db, user_id=None, account_ids=None):
+    """Load the active accounts of a user and/or with the given ids, ordered by id."""
+    query = select(Account.id, Account.current_balance).where(
+        Account.deleted_at.is_(None)
+    )
+    if user_id is not None:
+        query = query.where(Account.user_id == user_id)
+    if account_ids:
+        query = query.where(Account.id.in_(account_ids))
+    return [
+        AccountSpec(id, balance or 0.0)
+        for id, balance in db.execute(query.order_by(Account.id))
+    ]
@@ -1,13 +1,28 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api import (accounts, auth, bills, forecast, transactions,
+from app.api import (accounts, auth, bills, forecast, metrics, transactions,
                      user_settings, users)
 from app.core.audit import register_audit_listeners
 from app.core.config import settings
+from app.core.forecast_cache import register_cache_listeners
+from app.core.materialized import register_materialized_listeners
 from app.core.rate_limit import RateLimiterMiddleware
 
-app = FastAPI(title=settings.PROJECT_NAME)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Worker processes for simulations live as long as the app
+    forecast.start_simulation_pool()
+    try:
+        yield
+    finally:
+        forecast.shutdown_simulation_pool()
+
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 # Allow frontend dev server
 origins = [
@@ -36,9 +51,14 @@ app.include_router(
 )
 app.include_router(forecast.router)
 app.include_router(users.router)
+app.include_router(metrics.router, tags=["internal"])
 
 # Register audit listeners
 register_audit_listeners()
+# Invalidate cached forecasts when the data behind them changes
+register_cache_listeners()
+# Patch materialized daily balances in the same transaction as the change
+register_materialized_listeners()
 
 
 @app.get("/")
@@ -1,13 +1,20 @@
 import datetime
 
-from sqlalchemy import (JSON, Boolean, Column, Date, DateTime, Float,
-                        ForeignKey, Integer, String)
+from sqlalchemy import (JSON, BigInteger, Boolean, Column, Date, DateTime,
+                        Float, ForeignKey, Index, Integer, String,
+                        UniqueConstraint)
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 from app.core.database import Base
 
 
+def _active_index(name, *columns):
+    """Index only the rows that are not soft-deleted, which every hot query filters on."""
+    where = text("deleted_at IS NULL")
+    return Index(name, *columns, postgresql_where=where, sqlite_where=where)
+
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True, index=True)
@@ -36,6 +43,8 @@ class Account(Base):
     created_at = Column(DateTime, server_default=func.now())
     deleted_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (_active_index("ix_accounts_user_id_active", "user_id"),)
+
     user = relationship("User", back_populates="accounts")
     bills = relationship("Bill", back_populates="account", cascade="all, delete-orphan")
     transactions = relationship(
@@ -56,11 +65,15 @@ class Bill(Base):
     amount = Column(Float, nullable=False)
     start_date = Column(DateTime, nullable=False)
     end_date = Column(DateTime, nullable=True)
-    recurrence = Column(String(20), nullable=True)  # e.g., "MONTHLY", "EOM"
+    recurrence = Column(String(255), nullable=True)  # e.g., "MONTHLY", RRULE
+    amount_stddev = Column(Float, nullable=True)  # Spread of the amount, if it varies
+    amount_samples = Column(JSON, nullable=True)  # Observed amounts, if it varies
     notes = Column(String(255), nullable=True)
     created_at = Column(DateTime, default=datetime.datetime.now(datetime.timezone.utc))
     deleted_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (_active_index("ix_bills_account_id_active", "account_id"),)
+
     account = relationship("Account", back_populates="bills")
 
 
@@ -77,12 +90,18 @@ class Transaction(Base):
     amount = Column(Float, nullable=False)
     date = Column(DateTime, nullable=False)
     is_recurring = Column(Boolean, default=False)
-    recurrence = Column(String(20), nullable=True)  # e.g., "MONTHLY", "EOM"
+    recurrence = Column(String(255), nullable=True)  # e.g., "MONTHLY", RRULE
     end_date = Column(DateTime, nullable=True)
+    amount_stddev = Column(Float, nullable=True)  # Spread of the amount, if it varies
+    amount_samples = Column(JSON, nullable=True)  # Observed amounts, if it varies
     notes = Column(String(255), nullable=True)
     created_at = Column(DateTime, default=datetime.datetime.now(datetime.timezone.utc))
     deleted_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        _active_index("ix_transactions_account_id_date_active", "account_id", "date"),
+    )
+
     account = relationship("Account", back_populates="transactions")
 
 
@@ -125,5 +144,34 @@ class ForecastOverride(Base):
     skip = Column(Boolean, default=False)  # If True, skip this event
     override_amount = Column(Float, nullable=True)  # If set, use this amount instead
 
+    __table_args__ = (
+        # One override per occurrence, behind the POST /overrides upsert
+        UniqueConstraint(
+            "user_id",
+            "account_id",
+            "event_type",
+            "event_id",
+            "event_date",
+            name="uq_forecast_overrides_occurrence",
+        ),
+        Index(
+            "ix_forecast_overrides_account_id_event_date", "account_id", "event_date"
+        ),
+    )
+
     user = relationship("User")
     account = relationship("Account")
+
+
+class ForecastDailyBalance(Base):
+    """
+    Materialized projected balance of an account at the end of each day.
+
+    Rows are written with Core statements by app.core.materialized, which keeps
+    them in sync with bill, transaction, override and balance changes.
+    """
+
+    __tablename__ = "forecast_daily_balances"
+    account_id = Column(Integer, ForeignKey("accounts.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    balance_cents = Column(BigInteger, nullable=False)  # Exact, in cents
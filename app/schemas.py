@@ -1,7 +1,18 @@
 from datetime import date, datetime
-from typing import Dict, List, Optional
+from typing import Dict, Generic, List, Literal, Optional, TypeVar
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, field_validator
+
+from app.core.recurrence import compile_rule
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """One page of a keyset-paginated list."""
+
+    items: List[T]
+    next_cursor: Optional[str] = None
 
 
 # ---------- User Schemas ----------
@@ -47,16 +58,24 @@ class Account(AccountBase):
 class BillBase(BaseModel):
     """
     Base schema for Bill.
-    TODO: Add validation for recurrence rules and support for forecasting.
     """
 
     name: str
     amount: float
     start_date: datetime
     end_date: Optional[datetime] = None
-    recurrence: Optional[str] = None  # e.g., "MONTHLY", "EOM"
+    recurrence: Optional[str] = None  # e.g., "MONTHLY", "EOM", "FREQ=WEEKLY;BYDAY=FR"
+    amount_stddev: Optional[float] = Field(None, ge=0)
+    amount_samples: Optional[List[float]] = None
     notes: Optional[str] = None
 
+    @field_validator("recurrence")
+    @classmethod
+    def validate_recurrence(cls, value):
+        if value:
+            compile_rule(value)
+        return value
+
 
 class BillCreate(BillBase):
     account_id: int
@@ -75,7 +94,7 @@ class Bill(BillBase):
 class TransactionBase(BaseModel):
     """
     Base schema for Transaction.
-    TODO: Add validation for recurrence and forecasting fields.
+    TODO: Add validation for forecasting fields.
     """
 
     name: str
@@ -84,8 +103,17 @@ class TransactionBase(BaseModel):
     is_recurring: bool = False
     recurrence: Optional[str] = None
     end_date: Optional[datetime] = None
+    amount_stddev: Optional[float] = Field(None, ge=0)
+    amount_samples: Optional[List[float]] = None
     notes: Optional[str] = None
 
+    @field_validator("recurrence")
+    @classmethod
+    def validate_recurrence(cls, value):
+        if value:
+            compile_rule(value)
+        return value
+
 
 class TransactionCreate(TransactionBase):
     account_id: int
@@ -136,6 +164,112 @@ class ForecastResponse(BaseModel):
     events: List[dict]
 
 
+class ConsolidatedForecastResponse(ForecastResponse):
+    account_ids: List[int]
+
+
+class ForecastBatchResponse(BaseModel):
+    results: Dict[int, ForecastResponse]
+
+
+class BalanceChange(BaseModel):
+    date: date
+    balance: float
+
+
+class BalanceRun(BaseModel):
+    start: date
+    end: date
+    min_balance: float
+
+
+class ForecastChangesResponse(BaseModel):
+    start_date: date
+    end_date: date
+    changes: List[BalanceChange]
+    alerts: List[BalanceRun]
+    balances: Optional[Dict[str, float]] = None
+
+
+class SafeToSpendResult(BaseModel):
+    date: date
+    safe_to_spend: float
+    min_balance: float
+    min_balance_date: date
+
+
+class SafeToSpendResponse(BaseModel):
+    results: Dict[int, SafeToSpendResult]
+
+
+class AlertTier(BaseModel):
+    name: str
+    threshold: float
+    first_date: Optional[date] = None
+    days_below: int
+
+
+class TieredAlertsResponse(BaseModel):
+    account_id: int
+    tiers: List[AlertTier]
+
+
+ScenarioEventType = Literal["bill", "transaction"]
+
+
+class ScenarioSkip(BaseModel):
+    event_type: ScenarioEventType
+    event_id: int
+    event_date: date
+
+
+class ScenarioAmount(BaseModel):
+    event_type: ScenarioEventType
+    event_id: int
+    amount: float  # New amount of every occurrence in the window
+
+
+class ScenarioOneOff(BaseModel):
+    # "bill" for an expense, "transaction" for income
+    event_type: ScenarioEventType = "bill"
+    date: date
+    amount: float
+
+
+class Scenario(BaseModel):
+    name: str
+    skip: List[ScenarioSkip] = []
+    amounts: List[ScenarioAmount] = []
+    add: List[ScenarioOneOff] = []
+    buffer: Optional[float] = None  # Defaults to the request buffer
+
+
+class ScenarioRequest(BaseModel):
+    account_id: int
+    months: int = Field(3, ge=1, le=12)
+    buffer: float = Field(50.0, ge=0)
+    scenarios: List[Scenario] = Field(..., max_length=100)
+
+
+class ScenarioResult(BaseModel):
+    name: str
+    alerts: List[str]
+    min_balance: float
+    min_balance_date: date
+    end_balance: float
+
+
+class ScenariosResponse(BaseModel):
+    baseline: ScenarioResult
+    scenarios: List[ScenarioResult]
+
+
+class SimulationResponse(BaseModel):
+    paths: int
+    percentiles: Dict[str, Dict[str, float]]
+    breach_probability: Dict[str, float]
+
+
 class OverrideResponse(BaseModel):
     status: str
     override_id: int
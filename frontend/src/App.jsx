@@ -5,8 +5,10 @@ import OverrideForm from './components/OverrideForm.jsx';
 import AccountSelector from './components/AccountSelector.jsx';
 import BalanceChart from './components/BalanceChart.jsx';
 import BalanceCalendar from './components/BalanceCalendar.jsx';
+import { fetchAccounts } from './api/forecast.js';
 
 const API_URL = import.meta.env.VITE_REACT_APP_API_URL;
+const USER_ID = import.meta.env.VITE_REACT_APP_USER_ID || 1;
 
 function App() {
   const [accounts, setAccounts] = useState([]);
@@ -18,8 +20,7 @@ function App() {
 
   useEffect(() => {
     // Fetch accounts
-    fetch(`${API_URL}/accounts`)
-      .then((res) => res.json())
+    fetchAccounts(USER_ID)
       .then((data) => setAccounts(data))
       .catch(() => console.error('Failed to fetch accounts'));
   }, []);
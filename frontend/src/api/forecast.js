@@ -1,9 +1,19 @@
 const API_URL = import.meta.env.VITE_REACT_APP_API_URL;
 
-export async function fetchAccounts() {
-  const res = await fetch(`${API_URL}/accounts`);
-  if (!res.ok) throw new Error("Failed to fetch accounts");
-  return res.json();
+// Accounts of a user, following the pagination cursor through every page
+export async function fetchAccounts(userId) {
+  const accounts = [];
+  let cursor = null;
+  do {
+    const params = new URLSearchParams({ user_id: userId, limit: 500 });
+    if (cursor) params.set("cursor", cursor);
+    const res = await fetch(`${API_URL}/accounts?${params}`);
+    if (!res.ok) throw new Error("Failed to fetch accounts");
+    const page = await res.json();
+    accounts.push(...page.items);
+    cursor = page.next_cursor;
+  } while (cursor);
+  return accounts;
 }
 
 export async function fetchForecast(accountId, months = 3, buffer = 50) {
@@ -0,0 +1,65 @@
+"""Forecast indexes and the override occurrence key
+
+Partial indexes cover the active rows the forecast loaders read; the unique
+key makes POST /overrides a real upsert. Duplicate overrides of the same
+occurrence, which the old select-then-insert could create, are collapsed to
+the most recent one first.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+ACTIVE = sa.text("deleted_at IS NULL")
+
+
+def _create_active_index(name, table, columns):
+    op.create_index(name, table, columns, postgresql_where=ACTIVE, sqlite_where=ACTIVE)
+
+
+def upgrade():
+    _create_active_index("ix_accounts_user_id_active", "accounts", ["user_id"])
+    _create_active_index("ix_bills_account_id_active", "bills", ["account_id"])
+    _create_active_index(
+        "ix_transactions_account_id_date_active",
+        "transactions",
+        ["account_id", "date"],
+    )
+    op.create_index(
+        "ix_forecast_overrides_account_id_event_date",
+        "forecast_overrides",
+        ["account_id", "event_date"],
+    )
+    op.execute(
+        """
+        DELETE FROM forecast_overrides
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM forecast_overrides
+            GROUP BY user_id, account_id, event_type, event_id, event_date
+        )
+        """
+    )
+    with op.batch_alter_table("forecast_overrides") as batch_op:
+        batch_op.create_unique_constraint(
+            "uq_forecast_overrides_occurrence",
+            ["user_id", "account_id", "event_type", "event_id", "event_date"],
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("forecast_overrides") as batch_op:
+        batch_op.drop_constraint("uq_forecast_overrides_occurrence", type_="unique")
+    op.drop_index(
+        "ix_forecast_overrides_account_id_event_date", table_name="forecast_overrides"
+    )
+    op.drop_index("ix_transactions_account_id_date_active", table_name="transactions")
+    op.drop_index("ix_bills_account_id_active", table_name="bills")
+    op.drop_index("ix_accounts_user_id_active", table_name="accounts")
@@ -0,0 +1,57 @@
+"""Recurrence rules, amount variability and the materialized forecast
+
+Widens bill and transaction recurrence to hold RRULE strings, adds the amount
+spread and samples the simulation reads, and creates the per-day balance store.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+EVENT_TABLES = ("bills", "transactions")
+
+
+def upgrade():
+    for table in EVENT_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                "recurrence",
+                existing_type=sa.String(length=20),
+                type_=sa.String(length=255),
+                existing_nullable=True,
+            )
+            batch_op.add_column(sa.Column("amount_stddev", sa.Float(), nullable=True))
+            batch_op.add_column(sa.Column("amount_samples", sa.JSON(), nullable=True))
+    op.create_table(
+        "forecast_daily_balances",
+        sa.Column("account_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("balance_cents", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["account_id"],
+            ["accounts.id"],
+        ),
+        sa.PrimaryKeyConstraint("account_id", "day"),
+    )
+
+
+def downgrade():
+    op.drop_table("forecast_daily_balances")
+    for table in EVENT_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("amount_samples")
+            batch_op.drop_column("amount_stddev")
+            batch_op.alter_column(
+                "recurrence",
+                existing_type=sa.String(length=255),
+                type_=sa.String(length=20),
+                existing_nullable=True,
+            )
@@ -2,9 +2,11 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.database import Base, get_db
+from app.core.forecast_cache import forecast_cache
 from app.main import app
 
 # Use SQLite file database for tests
@@ -13,15 +15,17 @@ engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# The API runs on an async session; it shares the same file through aiosqlite
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db")
+AsyncTestingSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
 
 
 # Dependency override
-def override_get_db():
-    db = TestingSessionLocal()
-    try:
+async def override_get_db():
+    async with AsyncTestingSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 app.dependency_overrides[get_db] = override_get_db
@@ -52,4 +56,5 @@ def setup_and_teardown_db():
     # Drop and recreate all tables before each test function
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    forecast_cache.clear()
     yield
@@ -1,7 +1,12 @@
-from datetime import datetime
+import asyncio
+import time
+from datetime import datetime, timedelta
 
+import httpx
 from fastapi.testclient import TestClient
 
+from app.api import forecast as forecast_api
+from app.core.config import settings
 from app.main import app
 from tests.conftest import TestingSessionLocal
 
@@ -92,6 +97,417 @@ def test_forecast_and_alerts_endpoints():
     assert isinstance(data["alerts"], list)
 
 
+def test_forecast_events_include_recurring_transactions_and_overrides():
+    db = TestingSessionLocal()
+    today = datetime.now()
+    user = make_user(db)
+    account = make_account(db, user_id=user.id, balance=100)
+    bill = make_bill(db, account.id, 10, today, "DAILY")
+    make_tx(db, account.id, 30, today, is_recurring=True, recurrence="WEEKLY")
+    account_id, user_id, bill_id = account.id, user.id, bill.id
+    db.close()
+
+    client.post(
+        "/overrides",
+        json={
+            "user_id": user_id,
+            "account_id": account_id,
+            "event_type": "bill",
+            "event_id": bill_id,
+            "event_date": today.date().isoformat(),
+            "override_amount": 4.0,
+        },
+    )
+    response = client.get(f"/forecast?account_id={account_id}&months=1&buffer=0")
+    assert response.status_code == 200
+    data = response.json()
+    weekly = [e for e in data["events"] if e["type"] == "transaction"]
+    assert len(weekly) == 5  # 30-day horizon
+    first_bill = next(e for e in data["events"] if e["type"] == "bill")
+    assert first_bill["amount"] == 4.0
+    # 100 + 30 - 4
+    assert data["balances"][today.date().isoformat()] == 126
+
+
+async def test_concurrent_forecasts_share_the_event_loop():
+    db = TestingSessionLocal()
+    user = make_user(db)
+    account = make_account(db, user_id=user.id, balance=100)
+    make_bill(db, account.id, 10, datetime.now(), "DAILY")
+    account_id = account.id
+    db.close()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        responses = await asyncio.gather(
+            *(
+                ac.get(f"/forecast/changes?account_id={account_id}&buffer={i}")
+                for i in range(20)
+            )
+        )
+    assert {response.status_code for response in responses} == {200}
+    assert len({len(r.json()["alerts"]) for r in responses}) == 1
+
+
+async def test_forecast_engine_runs_off_the_event_loop(monkeypatch):
+    db = TestingSessionLocal()
+    user = make_user(db)
+    account = make_account(db, user_id=user.id, balance=100)
+    account_id = account.id
+    db.close()
+    compute = forecast_api.balance_changes
+
+    def slow_balance_changes(*args):
+        time.sleep(0.5)
+        return compute(*args)
+
+    monkeypatch.setattr(forecast_api, "balance_changes", slow_balance_changes)
+    finished = []
+
+    async def fetch(url):
+        response = await ac.get(url)
+        finished.append(url)
+        return response
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        slow = asyncio.create_task(fetch(f"/forecast/changes?account_id={account_id}"))
+        await asyncio.sleep(0.1)
+        assert (await fetch("/")).status_code == 200
+        assert (await slow).status_code == 200
+    # The cheap request was served while the forecast was computing
+    assert finished[0] == "/"
+
+
+def test_forecast_batch_for_user_and_account_ids():
+    db = TestingSessionLocal()
+    today = datetime.now()
+    user = make_user(db)
+    checking = make_account(db, user_id=user.id, balance=100)
+    savings = make_account(db, user_id=user.id, balance=500)
+    make_bill(db, checking.id, 10, today, "DAILY")
+    deleted = make_bill(db, savings.id, 400, today)
+    deleted.deleted_at = today
+    db.commit()
+    user_id, checking_id, savings_id = user.id, checking.id, savings.id
+    db.close()
+
+    response = client.get(f"/forecast/batch?user_id={user_id}&months=1&buffer=80")
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert set(results) == {str(checking_id), str(savings_id)}
+    single = client.get(f"/forecast?account_id={checking_id}&months=1&buffer=80")
+    assert results[str(checking_id)] == single.json()
+    # Soft-deleted bills do not feed the forecast
+    assert set(results[str(savings_id)]["balances"].values()) == {500}
+
+    response = client.get(f"/forecast/batch?account_ids={savings_id}")
+    assert list(response.json()["results"]) == [str(savings_id)]
+
+    assert client.get("/forecast/batch").status_code == 400
+
+
+def test_forecast_consolidated():
+    db = TestingSessionLocal()
+    today = datetime.now()
+    user = make_user(db)
+    checking = make_account(db, user_id=user.id, balance=100)
+    savings = make_account(db, user_id=user.id, balance=500)
+    make_bill(db, checking.id, 10, today, "DAILY")
+    make_tx(db, savings.id, 25, today)
+    user_id = user.id
+    db.close()
+
+    response = client.get(
+        f"/forecast/consolidated?user_id={user_id}&months=1&buffer=600"
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["account_ids"]) == 2
+    # 100 + 500 - 10 + 25
+    assert data["balances"][today.date().isoformat()] == 615
+    # 615 - 10 * 2 = 595 on the third day
+    assert data["alerts"][0] == (today.date() + timedelta(days=2)).isoformat()
+
+
+def test_alerts_runs_and_first_only():
+    db = TestingSessionLocal()
+    today = datetime.now()
+    user = make_user(db)
+    account = make_account(db, user_id=user.id, balance=100)
+    make_bill(db, account.id, 80, today + timedelta(days=2))
+    make_tx(db, account.id, 80, today + timedelta(days=5))
+    make_bill(db, account.id, 90, today + timedelta(days=10))
+    account_id = account.id
+    db.close()
+
+    day = [(today.date() + timedelta(days=i)).isoformat() for i in range(30)]
+    url = f"/alerts?account_id={account_id}&months=1&buffer=50"
+    assert client.get(url).json()["alerts"] == day[2:5] + day[10:]
+    assert client.get(url + "&runs=true").json() == {
+        "alerts": [[day[2], day[4], 20], [day[10], day[29], 10]]
+    }
+    assert client.get(url + "&first_only=true").json() == {"alerts": [day[2]]}
+    assert client.get(url + "&first_only=true&runs=true").json() == {
+        "alerts": [[day[2], day[4], 20]]
+    }
+    assert client.get(
+        f"/alerts?account_id={account_id}&buffer=0&first_only=true"
+    ).json() == {"alerts": []}
+
+
+def test_safe_to_spend_for_user():
+    db = TestingSessionLocal()
+    today = datetime.now()
+    user = make_user(db)
+    checking = make_account(db, user_id=user.id, balance=500)
+    savings = make_account(db, user_id=user.id, balance=100)
+    make_bill(db, checking.id, 300, today + timedelta(days=3))
+    make_tx(db, checking.id, 1000, today + timedelta(days=5))
+    user_id, checking_id, savings_id = user.id, checking.id, savings.id
+    db.close()
+
+    response = client.get(f"/forecast/safe_to_spend?user_id={user_id}&buffer=50")
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[str(checking_id)] == {
+        "date": today.date().isoformat(),
+        "safe_to_spend": 150,
+        "min_balance": 200,
+        "min_balance_date": (today.date() + timedelta(days=3)).isoformat(),
+    }
+    assert results[str(savings_id)]["safe_to_spend"] == 50
+
+    on_date = (today.date() + timedelta(days=5)).isoformat()
+    data = client.get(
+        f"/forecast/safe_to_spend?account_ids={checking_id}&on_date={on_date}"
+    ).json()
+    assert data["results"][str(checking_id)]["safe_to_spend"] == 1150
+    assert client.get("/forecast/safe_to_spend").status_code == 400
+    assert (
+        client.get(
+            f"/forecast/safe_to_spend?user_id={user_id}&on_date=2000-01-01"
+        ).status_code
+        == 400
+    )
+
+
+def test_tiered_alerts():
+    from app.models import UserSettings
+
+    db = TestingSessionLocal()
+    today = datetime.now()
+    user = make_user(db)
+    db.add(UserSettings(user_id=user.id, buffer_amount=150))
+    account = make_account(db, user_id=user.id, balance=200)
+    make_bill(db, account.id, 100, today + timedelta(days=1))
+    make_bill(db, account.id, 120, today + timedelta(days=4))
+    account_id = account.id
+    db.close()
+
+    day = today.date() + timedelta(days=1)
+    response = client.get(f"/alerts/tiers?account_id={account_id}&months=1")
+    assert response.status_code == 200
+    assert response.json()["tiers"] == [
+        {
+            "name": "warning",
+            "threshold": 150,
+            "first_date": day.isoformat(),
+            "days_below": 29,
+        },
+        {
+            "name": "critical",
+            "threshold": 20,
+            "first_date": (day + timedelta(days=3)).isoformat(),
+            "days_below": 26,
+        },
+        {
+            "name": "overdraft",
+            "threshold": 0,
+            "first_date": (day + timedelta(days=3)).isoformat(),
+            "days_below": 26,
+        },
+    ]
+    data = client.get(f"/alerts/tiers?account_id={account_id}&warning=50").json()
+    assert data["tiers"][0]["first_date"] == (day + timedelta(days=3)).isoformat()
+    assert client.get("/alerts/tiers?account_id=9999").status_code == 404
+
+
+def test_forecast_scenarios():
+    from app.models import ForecastOverride
+
+    db = TestingSessionLocal()
+    today = datetime.now()
+    user = make_user(db)
+    account = make_account(db, user_id=user.id, balance=100)
+    bill = make_bill(db, account.id, 10, today, "DAILY")
+    account_id, bill_id = account.id, bill.id
+    db.close()
+
+    payload = {
+        "account_id": account_id,
+        "months": 1,
+        "buffer": 50,
+        "scenarios": [
+            {
+                "name": "skip today",
+                "skip": [
+                    {
+                        "event_type": "bill",
+                        "event_id": bill_id,
+                        "event_date": today.date().isoformat(),
+                    }
+                ],
+            },
+            {
+                "name": "cheaper",
+                "amounts": [{"event_type": "bill", "event_id": bill_id, "amount": 1}],
+                "add": [{"date": today.date().isoformat(), "amount": 40}],
+                "buffer": 0,
+            },
+        ],
+    }
+    response = client.post("/forecast/scenarios", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["baseline"]["end_balance"] == 100 - 10 * 30
+    assert (
+        data["baseline"]["alerts"][0] == (today.date() + timedelta(days=5)).isoformat()
+    )
+    skip, cheaper = data["scenarios"]
+    assert skip["name"] == "skip today"
+    assert skip["end_balance"] == 100 - 10 * 29
+    assert cheaper["end_balance"] == 100 - 40 - 30
+    assert cheaper["alerts"] == []
+    assert cheaper["min_balance"] == 30
+
+    db = TestingSessionLocal()
+    assert db.query(ForecastOverride).count() == 0
+    db.close()
+    payload["account_id"] = 9999
+    assert client.post("/forecast/scenarios", json=payload).status_code == 404
+
+    payload["scenarios"][1]["add"][0]["event_type"] = "bills"
+    assert client.post("/forecast/scenarios", json=payload).status_code == 422
+
+
+def test_forecast_scenarios_alert_in_cents_like_alerts():
+    db = TestingSessionLocal()
+    user = make_user(db)
+    account = make_account(db, user_id=user.id, balance=50)
+    account_id = account.id
+    db.close()
+
+    # The balance sits exactly on the buffer once both are rounded to cents
+    buffer = 50.001
+    payload = {"account_id": account_id, "months": 1, "buffer": buffer}
+    payload["scenarios"] = [{"name": "same"}]
+    data = client.post("/forecast/scenarios", json=payload).json()
+    alerts = client.get(f"/alerts?account_id={account_id}&months=1&buffer={buffer}")
+    assert alerts.json() == {"alerts": []}
+    assert data["baseline"]["alerts"] == []
+    assert data["scenarios"][0]["alerts"] == []
+
+
+def test_forecast_simulate(monkeypatch):
+    from app.models import Bill
+
+    db = TestingSessionLocal()
+    today = datetime.now()
+    user = make_user(db)
+    account = make_account(db, user_id=user.id, balance=100)
+    db.add(
+        Bill(
+            account_id=account.id,
+            name="Power",
+            amount=50,
+            start_date=today + timedelta(days=1),
+            amount_stddev=10,
+        )
+    )
+    db.commit()
+    account_id = account.id
+    db.close()
+
+    url = f"/forecast/simulate?account_id={account_id}&months=1&paths=500&seed=1"
+    response = client.get(url)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["paths"] == 500
+    assert set(data["percentiles"]) == {"p5", "p25", "p50", "p75", "p95"}
+    day = [(today.date() + timedelta(days=i)).isoformat() for i in range(2)]
+    assert data["percentiles"]["p50"][day[0]] == 100
+    assert data["percentiles"]["p5"][day[1]] < 50 < data["percentiles"]["p95"][day[1]]
+    assert 0.3 < data["breach_probability"][day[1]] < 0.7
+    assert client.get(url).json() == data
+    assert client.get("/forecast/simulate?account_id=9999").status_code == 404
+
+    # The process pool is created at startup and stopped at shutdown
+    monkeypatch.setattr(settings, "SIMULATION_WORKERS", 1)
+    with TestClient(app) as pooled:
+        pool = forecast_api._simulation_executor()
+        assert pool is not None
+        assert pooled.get(url).json()["paths"] == 500
+    assert forecast_api._simulation_executor() is None
+
+
+def test_forecast_changes_long_horizon():
+    db = TestingSessionLocal()
+    today = datetime.now()
+    user = make_user(db)
+    account = make_account(db, user_id=user.id, balance=100)
+    make_bill(db, account.id, 80, today + timedelta(days=1), "YEARLY")
+    account_id = account.id
+    db.close()
+
+    response = client.get(f"/forecast/changes?account_id={account_id}&months=120")
+    assert response.status_code == 200
+    data = response.json()
+    assert "balances" not in data
+    assert len(data["changes"]) == 11  # Opening plus ten yearly payments
+    assert data["changes"][1] == {
+        "date": (today.date() + timedelta(days=1)).isoformat(),
+        "balance": 20,
+    }
+    # Below buffer from the first payment to the end of the horizon
+    assert data["alerts"] == [
+        {
+            "start": data["changes"][1]["date"],
+            "end": data["end_date"],
+            "min_balance": 100 - 80 * 10,
+        }
+    ]
+
+    data = client.get(
+        f"/forecast/changes?account_id={account_id}&months=1&daily=true"
+    ).json()
+    assert len(data["balances"]) == 30
+    assert client.get("/forecast/changes?account_id=9999").status_code == 404
+
+
+def test_forecast_paths_skip_soft_deleted_rows():
+    db = TestingSessionLocal()
+    today = datetime.now()
+    user = make_user(db)
+    account = make_account(db, user_id=user.id, balance=100)
+    make_bill(db, account.id, 10, today, "DAILY")
+    make_bill(db, account.id, 70, today).deleted_at = today
+    make_tx(db, account.id, 50, today).deleted_at = today
+    closed = make_account(db, user_id=user.id, balance=100)
+    closed.deleted_at = today
+    db.commit()
+    account_id, closed_id = account.id, closed.id
+    db.close()
+
+    data = client.get(f"/forecast?account_id={account_id}&months=1&buffer=0").json()
+    assert [e["amount"] for e in data["events"][:1]] == [10]
+    assert data["balances"][today.date().isoformat()] == 90
+    changes = client.get(f"/forecast/changes?account_id={account_id}").json()
+    assert changes["changes"][0]["balance"] == 90
+    response = client.get(f"/forecast/changes?account_id={closed_id}")
+    assert response.status_code == 404
+
+
 def test_create_override():
     db = TestingSessionLocal()
     today = datetime.now()
@@ -121,6 +537,11 @@ def test_create_override():
     assert data["status"] == "override saved"
     assert "override_id" in data
 
+    # Posting the same occurrence again updates it in place
+    payload.update(skip=False, override_amount=25)
+    again = client.post("/overrides", json=payload).json()
+    assert again["override_id"] == data["override_id"]
+
 
 if __name__ == "__main__":
     import pytest
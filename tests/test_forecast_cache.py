@@ -0,0 +1,83 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from app.core import forecast_cache as forecast_cache_module
+from app.core.forecast_cache import ForecastCache, forecast_cache
+from app.main import app
+from app.models import Account, Bill
+from tests.conftest import TestingSessionLocal
+from tests.helpers import add_account, get_or_create_user
+
+client = TestClient(app)
+
+
+def test_cache_lru_eviction_and_stats():
+    cache = ForecastCache(maxsize=2)
+    calls = []
+
+    def compute(value):
+        return lambda: calls.append(value) or value
+
+    today = datetime(2024, 1, 1).date()
+    assert cache.get_or_compute(1, 90, 50.0, today, compute("a")) == "a"
+    assert cache.get_or_compute(1, 90, 50.0, today, compute("b")) == "a"
+    cache.get_or_compute(2, 90, 50.0, today, compute("c"))
+    cache.get_or_compute(3, 90, 50.0, today, compute("d"))
+    assert calls == ["a", "c", "d"]
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["evictions"] == 1
+    assert stats["hit_ratio"] == 0.25
+
+    cache.bump({3})
+    assert cache.get_or_compute(3, 90, 50.0, today, compute("e")) == "e"
+
+
+def test_cache_local_entries_expire(monkeypatch):
+    cache = ForecastCache(ttl_seconds=60)
+    now = [1000.0]
+    monkeypatch.setattr(forecast_cache_module.time, "monotonic", lambda: now[0])
+    today = datetime(2024, 1, 1).date()
+    assert cache.get_or_compute(1, 90, 50.0, today, lambda: "a") == "a"
+    now[0] += 59
+    assert cache.get_or_compute(1, 90, 50.0, today, lambda: "b") == "a"
+
+    # Another worker's write bumps no version here, the TTL bounds staleness
+    now[0] += 1
+    assert cache.get_or_compute(1, 90, 50.0, today, lambda: "b") == "b"
+    assert cache.stats()["misses"] == 2
+
+
+def test_forecast_cache_invalidated_by_writes():
+    db = TestingSessionLocal()
+    today = datetime.now()
+    account_id = add_account(db, get_or_create_user(db), current_balance=100)
+    db.close()
+
+    url = f"/forecast?account_id={account_id}&months=1&buffer=50"
+    first = client.get(url).json()
+    assert client.get(url).json() == first
+    assert client.get(f"/alerts?account_id={account_id}&months=1&buffer=50").json() == {
+        "alerts": []
+    }
+    assert forecast_cache.stats()["hits"] == 1
+
+    # A new bill bumps the account's data version
+    db = TestingSessionLocal()
+    db.add(Bill(account_id=account_id, name="Rent", amount=60, start_date=today))
+    db.commit()
+    db.close()
+    data = client.get(url).json()
+    assert data["balances"][today.date().isoformat()] == 40
+    assert data["alerts"]
+
+    # So does a balance change
+    db = TestingSessionLocal()
+    account = db.get(Account, account_id)
+    account.current_balance = 1000
+    db.commit()
+    db.close()
+    data = client.get(url).json()
+    assert data["balances"][today.date().isoformat()] == 940
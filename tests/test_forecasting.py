@@ -1,9 +1,15 @@
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from types import SimpleNamespace
 
+import numpy as np
 import pytest
 
-from app.core.forecasting import forecast_balance
+from app.core.forecasting import (BalanceChanges, balance_changes,
+                                  consolidated_forecast, first_below,
+                                  forecast_balance, run_forecast,
+                                  run_scenarios, safe_to_spend,
+                                  simulate_forecast, tiered_alerts, to_cents)
 
 
 def make_account(balance, id=1):
@@ -323,6 +329,294 @@ def test_forecast_daily_crossing_month_and_leap_day():
     assert mar_1 in alerts
 
 
+def test_run_forecast_events_match_balances_with_overrides():
+    today = datetime(2024, 3, 1).date()
+    account = make_account(100)
+    bills = [make_bill(10, datetime(2024, 3, 1), "DAILY", id=1)]
+    transactions = [make_tx(40, datetime(2024, 3, 2), id=2)]
+    overrides = {
+        ("bill", 1, today): SimpleNamespace(skip=True, override_amount=None),
+        ("bill", 1, datetime(2024, 3, 2).date()): SimpleNamespace(
+            skip=False, override_amount=25
+        ),
+    }
+    result = run_forecast(
+        account,
+        bills,
+        transactions,
+        horizon_days=3,
+        buffer_amount=90,
+        overrides=overrides,
+        start_date=today,
+    )
+    # Mar 1: bill skipped -> 100; Mar 2: +40 -25 -> 115; Mar 3: -10 -> 105
+    assert result.series.tolist() == [100, 115, 105]
+    assert result.alerts == []
+    assert [(e["type"], e["amount"], str(e["date"])) for e in result.events] == [
+        ("bill", 25, "2024-03-02"),
+        ("transaction", 40, "2024-03-02"),
+        ("bill", 10, "2024-03-03"),
+    ]
+    assert result.balances[today] == 100
+
+
+def test_consolidated_forecast_matches_sum_of_accounts():
+    today = datetime(2024, 1, 1).date()
+    start = datetime(2024, 1, 1)
+    accounts = [make_account(100, id=1), make_account(50, id=2), make_account(0, id=3)]
+    bills = {
+        1: [make_bill(30, start, "WEEKLY", id=1)],
+        2: [make_bill(5, start, "DAILY", id=2), make_bill(20, start, "EOM", id=3)],
+    }
+    transactions = {1: [make_tx(40, datetime(2024, 1, 10), True, "MONTHLY", id=4)]}
+    combined = consolidated_forecast(
+        accounts,
+        bills,
+        transactions,
+        horizon_days=45,
+        buffer_amount=0,
+        start_date=today,
+    )
+    expected = sum(
+        run_forecast(
+            account,
+            bills.get(account.id, []),
+            transactions.get(account.id, []),
+            horizon_days=45,
+            start_date=today,
+        ).series
+        for account in accounts
+    )
+    assert combined.series.tolist() == pytest.approx(expected.tolist())
+    assert combined.alerts == [
+        today + timedelta(days=i) for i in range(45) if expected[i] < 0
+    ]
+    event_dates = [e["date"] for e in combined.events]
+    assert event_dates == sorted(event_dates)
+    assert {e["account_id"] for e in combined.events} == {1, 2}
+
+
+def test_forecast_runs_on_exact_cents():
+    today = datetime(2024, 1, 1).date()
+    start = datetime(2024, 1, 1)
+    # 0.1 is inexact in binary; summing it in floats drifts off the buffer
+    result = run_forecast(
+        make_account(100.3),
+        [make_bill(0.1, start, "DAILY")],
+        [],
+        horizon_days=1000,
+        buffer_amount=0.3,
+        start_date=today,
+    )
+    assert result.cents.dtype == np.int64
+    assert result.cents[-1] == 10030 - 1000 * 10
+    assert result.series[-1] == 0.3
+    assert result.alerts == []
+    assert result.events[0]["amount"] == 0.1
+    assert to_cents([0.29, -1.005, 19.99]).tolist() == [29, -100, 1999]
+
+
+def test_balance_changes_match_daily_forecast():
+    today = datetime(2024, 1, 5).date()
+    account = make_account(100)
+    bills = [
+        make_bill(30, datetime(2024, 1, 8), "WEEKLY", id=1),
+        make_bill(200, datetime(2024, 1, 31), "EOM", id=2),
+    ]
+    transactions = [make_tx(150, datetime(2024, 1, 20), True, "MONTHLY", id=3)]
+    daily = run_forecast(
+        account, bills, transactions, horizon_days=365 * 5, start_date=today
+    )
+    changes = balance_changes(
+        account, bills, transactions, horizon_days=365 * 5, start_date=today
+    )
+    assert changes.series().tolist() == pytest.approx(daily.series.tolist())
+    # One segment per event day, plus the opening one
+    assert len(changes.days) == len({e["date"] for e in daily.events}) + 1
+
+    runs = changes.below(50)
+    assert [d for start, end, _ in runs for d in _days(start, end)] == daily.alerts
+    for start, end, low in runs:
+        offsets = slice((start - today).days, (end - today).days + 1)
+        assert low == pytest.approx(daily.series[offsets].min())
+    assert changes.below(50, first_only=True) == runs[:1]
+
+
+def test_balance_changes_without_events():
+    today = datetime(2024, 1, 1).date()
+    changes = balance_changes(make_account(10), [], [], 30, start_date=today)
+    assert changes.days.tolist() == [0]
+    assert changes.series().tolist() == [10] * 30
+    assert changes.below(50) == [(today, today + timedelta(days=29), 10)]
+
+
+@pytest.mark.parametrize(
+    "balance, buffer_amount",
+    [(100, 50), (100, 0), (20, 50), (1000, 50), (100, -1000)],
+)
+def test_first_below_matches_full_forecast(balance, buffer_amount):
+    today = datetime(2024, 2, 1).date()
+    account = make_account(balance)
+    bills = [
+        make_bill(60, datetime(2024, 2, 3), "WEEKLY", id=1),
+        make_bill(15, datetime(2023, 12, 31), "EOM", id=2),
+    ]
+    transactions = [make_tx(130, datetime(2024, 2, 9), True, "WEEKLY", id=3)]
+    overrides = {
+        ("bill", 1, datetime(2024, 2, 10).date()): SimpleNamespace(
+            skip=True, override_amount=None
+        ),
+        ("transaction", 3, datetime(2024, 2, 16).date()): SimpleNamespace(
+            skip=False, override_amount=10
+        ),
+    }
+    args = (account, bills, transactions)
+    expected = balance_changes(
+        *args, horizon_days=120, overrides=overrides, start_date=today
+    ).below(buffer_amount, first_only=True)
+    first = first_below(
+        *args, buffer_amount, horizon_days=120, overrides=overrides, start_date=today
+    )
+    assert ([first] if first else []) == expected
+
+
+def test_balance_changes_from_series():
+    today = datetime(2024, 1, 1).date()
+    changes = BalanceChanges.from_series(today, np.array([5.0, 5, 60, 60, 40, 40]))
+    assert changes.days.tolist() == [0, 2, 4]
+    assert changes.below(50) == [
+        (today, today + timedelta(days=1), 5),
+        (today + timedelta(days=4), today + timedelta(days=5), 40),
+    ]
+
+
+def test_safe_to_spend_uses_suffix_minimum():
+    today = datetime(2024, 1, 1).date()
+    series = np.array([500.0, 300, 400, 250, 600, 250, 700])
+    headroom = safe_to_spend(series, today, buffer_amount=50)
+    assert headroom.amount == 200
+    assert headroom.min_balance == 250
+    assert headroom.min_date == today + timedelta(days=3)
+
+    later = safe_to_spend(series, today, 50, today + timedelta(days=4))
+    assert (later.amount, later.min_date) == (200, today + timedelta(days=5))
+    assert safe_to_spend(series, today, 50, today + timedelta(days=6)).amount == 650
+    # Already below the buffer: nothing is safe to spend
+    assert safe_to_spend(series, today, 1000).amount == 0
+    with pytest.raises(ValueError):
+        safe_to_spend(series, today, 50, today + timedelta(days=7))
+
+
+def test_tiered_alerts_single_pass():
+    today = datetime(2024, 1, 1).date()
+    series = np.array([300.0, 150, 250, 40, 100, -20, 60])
+    thresholds = {"warning": 200, "critical": 50, "overdraft": 0, "floor": -100}
+    crossings = tiered_alerts(series, today, thresholds)
+    for name, level in thresholds.items():
+        below = np.flatnonzero(series < level)
+        first = today + timedelta(days=int(below[0])) if len(below) else None
+        assert crossings[name] == (first, len(below))
+    assert crossings["critical"] == (today + timedelta(days=3), 2)
+    assert crossings["floor"] == (None, 0)
+
+
+def test_run_scenarios_match_full_forecasts():
+    today = datetime(2024, 1, 1).date()
+    account = make_account(500)
+    bills = [make_bill(100, datetime(2024, 1, 5), "WEEKLY", id=1)]
+    transactions = [make_tx(300, datetime(2024, 1, 15), True, "MONTHLY", id=2)]
+    skip_day = datetime(2024, 1, 12).date()
+    scenarios = [
+        SimpleNamespace(skip=[], amounts=[], add=[]),
+        SimpleNamespace(
+            skip=[SimpleNamespace(event_type="bill", event_id=1, event_date=skip_day)],
+            amounts=[SimpleNamespace(event_type="bill", event_id=1, amount=80)],
+            add=[
+                SimpleNamespace(
+                    event_type="bill", date=datetime(2024, 1, 20).date(), amount=250
+                )
+            ],
+        ),
+    ]
+    baseline, results = run_scenarios(
+        account, bills, transactions, scenarios, horizon_days=60, start_date=today
+    )
+    expected = run_forecast(
+        account, bills, transactions, horizon_days=60, start_date=today
+    )
+    assert baseline.tolist() == expected.series.tolist()
+    assert results[0].tolist() == expected.series.tolist()
+
+    expected = run_forecast(
+        account,
+        [
+            make_bill(80, datetime(2024, 1, 5), "WEEKLY", id=1),
+            make_bill(250, datetime(2024, 1, 20), id=3),
+        ],
+        transactions,
+        horizon_days=60,
+        overrides={
+            ("bill", 1, skip_day): SimpleNamespace(skip=True, override_amount=None)
+        },
+        start_date=today,
+    )
+    assert results[1].tolist() == pytest.approx(expected.series.tolist())
+
+
+def test_simulate_forecast_without_variance_is_deterministic():
+    today = datetime(2024, 1, 1).date()
+    account = make_account(100)
+    bills = [make_bill(10, datetime(2024, 1, 1), "DAILY")]
+    expected = run_forecast(account, bills, [], horizon_days=30, start_date=today)
+    result = simulate_forecast(
+        account, bills, [], horizon_days=30, start_date=today, paths=200
+    )
+    for band in result.percentiles.values():
+        assert band.tolist() == pytest.approx(expected.series.tolist())
+    assert result.breach_probability.tolist() == [
+        float(balance < 50) for balance in expected.series
+    ]
+
+
+def test_simulate_forecast_with_variable_amounts():
+    today = datetime(2024, 1, 1).date()
+    account = make_account(100)
+    bills = [
+        SimpleNamespace(
+            **vars(make_bill(30, datetime(2024, 1, 3), "WEEKLY", id=1)),
+            amount_stddev=5.0,
+            amount_samples=None,
+        ),
+        SimpleNamespace(
+            **vars(make_bill(0, datetime(2024, 1, 2), id=2)),
+            amount_stddev=None,
+            amount_samples=[20, 60],
+        ),
+    ]
+    kwargs = dict(horizon_days=10, start_date=today, paths=4000, seed=7)
+    result = simulate_forecast(account, bills, [], chunk_size=1000, **kwargs)
+    assert result.paths == 4000
+    # Day 1 only has the empirical bill: 100 - 20 or 100 - 60, half of the time each
+    assert result.percentiles[5][1] == 40
+    assert result.percentiles[95][1] == 80
+    assert result.breach_probability[1] == pytest.approx(0.5, abs=0.05)
+    # Day 2 adds the normal bill around 30: 10 (below) or about 50 (below half the time)
+    assert result.percentiles[50][2] == pytest.approx(100 - 40 - 30, abs=15)
+    assert result.breach_probability[2] == pytest.approx(0.75, abs=0.05)
+
+    # Chunks are seeded independently of where they run
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        pooled = simulate_forecast(
+            account, bills, [], chunk_size=1000, executor=executor, **kwargs
+        )
+    for q, band in result.percentiles.items():
+        assert pooled.percentiles[q].tolist() == band.tolist()
+
+
+def _days(start, end):
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
 if __name__ == "__main__":
     import pytest
 
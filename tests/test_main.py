@@ -1,9 +1,13 @@
+from datetime import datetime, timedelta
+
 from fastapi.testclient import TestClient
 
+from app.api.pagination import encode_cursor
 from app.main import app
+from app.models import Transaction, User
 from tests.conftest import TestingSessionLocal
-from tests.helpers import (get_or_create_account, get_or_create_user,
-                           get_or_create_user_settings)
+from tests.helpers import (add_account, get_or_create_account,
+                           get_or_create_user, get_or_create_user_settings)
 
 client = TestClient(app)
 
@@ -33,9 +37,9 @@ def test_accounts_crud():
     assert account["name"] == "Test Account"
 
     # List accounts
-    response = client.get("/accounts/")
+    response = client.get("/accounts/", params={"user_id": user_id})
     assert response.status_code == 200
-    assert any(acc["name"] == "Test Account" for acc in response.json())
+    assert any(acc["name"] == "Test Account" for acc in response.json()["items"])
 
     # Soft-delete account
     response = client.delete(f"/accounts/{account['id']}")
@@ -47,6 +51,7 @@ def test_bills_crud():
     # Ensure account exists
     db = TestingSessionLocal()
     account_id = get_or_create_account(db)
+    user_id = get_or_create_user(db)
     db.close()
 
     # Create a bill (assume account_id 1 exists from seed)
@@ -64,9 +69,9 @@ def test_bills_crud():
     assert bill["name"] == "Internet"
 
     # List bills
-    response = client.get("/bills/")
+    response = client.get("/bills/", params={"user_id": user_id})
     assert response.status_code == 200
-    assert any(b["name"] == "Internet" for b in response.json())
+    assert any(b["name"] == "Internet" for b in response.json()["items"])
 
     # Soft-delete bill
     response = client.delete(f"/bills/{bill['id']}")
@@ -74,10 +79,31 @@ def test_bills_crud():
     assert response.json()["deleted_at"] is not None
 
 
+def test_bill_rejects_invalid_recurrence():
+    db = TestingSessionLocal()
+    account_id = get_or_create_account(db)
+    db.close()
+
+    payload = {
+        "account_id": account_id,
+        "name": "Gym",
+        "amount": 30.0,
+        "start_date": "2024-01-01T00:00:00",
+        "recurrence": "FREQ=FORTNIGHTLY",
+    }
+    response = client.post("/bills/", json=payload)
+    assert response.status_code == 422
+
+    payload["recurrence"] = "FREQ=WEEKLY;INTERVAL=2;BYDAY=FR"
+    response = client.post("/bills/", json=payload)
+    assert response.status_code == 200
+
+
 def test_transactions_crud():
     # Ensure account exists
     db = TestingSessionLocal()
     account_id = get_or_create_account(db)
+    user_id = get_or_create_user(db)
     db.close()
 
     payload = {
@@ -94,9 +120,9 @@ def test_transactions_crud():
     assert transaction["name"] == "Deposit"
 
     # List transactions
-    response = client.get("/transactions/")
+    response = client.get("/transactions/", params={"user_id": user_id})
     assert response.status_code == 200
-    assert any(t["name"] == "Deposit" for t in response.json())
+    assert any(t["name"] == "Deposit" for t in response.json()["items"])
 
     # Soft-delete transaction
     response = client.delete(f"/transactions/{transaction['id']}")
@@ -104,6 +130,58 @@ def test_transactions_crud():
     assert response.json()["deleted_at"] is not None
 
 
+def test_list_transactions_pages_by_date_and_owner():
+    db = TestingSessionLocal()
+    user_id = get_or_create_user(db)
+    checking = add_account(db, user_id, name="Checking")
+    savings = add_account(db, user_id, name="Savings")
+    other_user = User(email="other@example.com", hashed_password="fake")
+    db.add(other_user)
+    db.commit()
+    other = add_account(db, other_user.id)
+    start = datetime(2024, 1, 1)
+    # Inserted newest first, listed oldest first; two share a date
+    for day in (4, 3, 2, 2, 1, 0):
+        db.add(
+            Transaction(
+                account_id=checking if day % 2 else savings,
+                name=f"Day {day}",
+                amount=10,
+                date=start + timedelta(days=day),
+            )
+        )
+    db.add(Transaction(account_id=other, name="Not mine", amount=10, date=start))
+    db.commit()
+    db.close()
+
+    names, cursor = [], None
+    while True:
+        params = {"user_id": user_id, "limit": 4}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/transactions/", params=params).json()
+        names += [t["name"] for t in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert names == ["Day 0", "Day 1", "Day 2", "Day 2", "Day 3", "Day 4"]
+
+    params = {
+        "user_id": user_id,
+        "account_id": savings,
+        "start_date": "2024-01-01",
+        "end_date": "2024-01-03",
+    }
+    page = client.get("/transactions/", params=params).json()
+    assert [t["name"] for t in page["items"]] == ["Day 0", "Day 2", "Day 2"]
+    assert page["next_cursor"] is None
+
+    for bad in ("not-a-cursor", encode_cursor([1, 2]), encode_cursor(["x", 2])):
+        params = {"user_id": user_id, "cursor": bad}
+        assert client.get("/transactions/", params=params).status_code == 400
+    assert client.get("/transactions/").status_code == 422
+
+
 def test_user_settings_get_and_update():
     # Ensure user and settings exist
     db = TestingSessionLocal()
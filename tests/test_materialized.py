@@ -0,0 +1,328 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.api.forecast import get_accounts_data
+from app.core.config import settings
+from app.core.forecasting import load_overrides, run_forecast
+from app.core.materialized import read_series
+from app.core.nightly import forecast_chunk, load_chunk, store_chunk
+from app.core.specs import load_account_specs
+from app.main import app
+from app.models import Account, Bill, ForecastOverride, Transaction
+from tests.conftest import TestingSessionLocal, engine
+from tests.helpers import add_account, get_or_create_user
+
+client = TestClient(app)
+
+HORIZON = settings.MATERIALIZED_HORIZON_DAYS
+
+
+def full_recompute(db, account_id, today):
+    accounts, bills, transactions = get_accounts_data(db, account_ids=[account_id])
+    overrides = load_overrides(
+        db, account_id, today, today + timedelta(days=HORIZON - 1)
+    )
+    return run_forecast(
+        accounts[0],
+        bills[account_id],
+        transactions[account_id],
+        HORIZON,
+        overrides=overrides,
+        start_date=today,
+    ).series
+
+
+def assert_store_matches(account_id):
+    db = TestingSessionLocal()
+    today = datetime.now().date()
+    stored = read_series(db, account_id, today, HORIZON)
+    assert stored is not None
+    np.testing.assert_allclose(stored, full_recompute(db, account_id, today))
+    db.close()
+
+
+def build_store(account_id):
+    """Materialize one account the way the nightly job does."""
+    db = TestingSessionLocal()
+    today = datetime.now().date()
+    accounts = load_account_specs(db, account_ids=[account_id])
+    jobs = load_chunk(db, accounts, today, HORIZON)
+    store_chunk(db, jobs, forecast_chunk(jobs, today, HORIZON), today, HORIZON)
+    db.close()
+
+
+@pytest.fixture
+def materialized_account():
+    db = TestingSessionLocal()
+    today = datetime.now()
+    user_id = get_or_create_user(db)
+    account_id = add_account(db, user_id, current_balance=1000)
+    db.add(
+        Bill(
+            account_id=account_id,
+            name="Rent",
+            amount=300,
+            start_date=today + timedelta(days=3),
+            recurrence="MONTHLY",
+        )
+    )
+    db.commit()
+    db.close()
+    build_store(account_id)
+    assert_store_matches(account_id)
+    return user_id, account_id
+
+
+def test_alerts_read_from_store(materialized_account):
+    _, account_id = materialized_account
+    data = client.get(f"/alerts?account_id={account_id}&months=3&buffer=500").json()
+    expected = client.get(f"/forecast?account_id={account_id}&months=3&buffer=500")
+    assert data["alerts"] == expected.json()["alerts"]
+    assert client.get("/alerts?account_id=9999").json() == {
+        "error": "Account not found"
+    }
+
+
+def test_forecast_without_events_matches_forecast(materialized_account):
+    _, account_id = materialized_account
+    url = f"/forecast?account_id={account_id}&months=2&buffer=500"
+    full = client.get(url).json()
+    light = client.get(url + "&include_events=false").json()
+    assert light["balances"] == full["balances"]
+    assert light["alerts"] == full["alerts"]
+    assert light["events"] == []
+
+
+def test_store_patched_on_new_items(materialized_account):
+    _, account_id = materialized_account
+    today = datetime.now()
+    db = TestingSessionLocal()
+    db.add(
+        Transaction(
+            account_id=account_id,
+            name="Paycheck",
+            amount=500,
+            date=today + timedelta(days=1),
+            is_recurring=True,
+            recurrence="FREQ=WEEKLY;INTERVAL=2",
+        )
+    )
+    db.add(Bill(account_id=account_id, name="Once", amount=20, start_date=today))
+    db.commit()
+    db.close()
+    assert_store_matches(account_id)
+
+
+def test_store_patched_on_update_and_soft_delete(materialized_account):
+    _, account_id = materialized_account
+    db = TestingSessionLocal()
+    bill = db.query(Bill).filter_by(account_id=account_id).one()
+    bill.amount = 250
+    bill.recurrence = "WEEKLY"
+    db.commit()
+    assert_store_matches(account_id)
+
+    bill.deleted_at = datetime.now()
+    db.commit()
+    db.close()
+    assert_store_matches(account_id)
+
+
+def test_store_patched_on_override_and_balance(materialized_account):
+    user_id, account_id = materialized_account
+    db = TestingSessionLocal()
+    bill = db.query(Bill).filter_by(account_id=account_id).one()
+    event_date = bill.start_date.date()
+    override = ForecastOverride(
+        user_id=user_id,
+        account_id=account_id,
+        event_type="bill",
+        event_id=bill.id,
+        event_date=event_date,
+        override_amount=100,
+    )
+    db.add(override)
+    db.commit()
+    assert_store_matches(account_id)
+
+    override.skip = True
+    db.commit()
+    assert_store_matches(account_id)
+
+    db.delete(override)
+    account = db.get(Account, account_id)
+    account.current_balance = 50
+    db.commit()
+    db.close()
+    assert_store_matches(account_id)
+
+
+def test_store_patched_when_item_and_override_change_together(
+    materialized_account,
+):
+    user_id, account_id = materialized_account
+    db = TestingSessionLocal()
+    bill = db.query(Bill).filter_by(account_id=account_id).one()
+    override = ForecastOverride(
+        user_id=user_id,
+        account_id=account_id,
+        event_type="bill",
+        event_id=bill.id,
+        event_date=bill.start_date.date(),
+        override_amount=100,
+    )
+    db.add(override)
+    db.commit()
+    assert_store_matches(account_id)
+
+    bill.amount = 250
+    override.override_amount = 150
+    db.commit()
+    assert_store_matches(account_id)
+
+    bill.deleted_at = datetime.now()
+    override.skip = True
+    db.commit()
+    db.close()
+    assert_store_matches(account_id)
+
+
+def test_store_patch_reads_stored_rows_in_batches(materialized_account):
+    _, account_id = materialized_account
+    today = datetime.now()
+    db = TestingSessionLocal()
+    for i in range(9):
+        db.add(
+            Bill(
+                account_id=account_id,
+                name=f"Bill {i}",
+                amount=10 + i,
+                start_date=today + timedelta(days=i),
+                recurrence="WEEKLY",
+            )
+        )
+    db.commit()
+    bills = db.query(Bill).filter_by(account_id=account_id).all()
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    def select_count(edited):
+        # Reload the expired bills first, only the flush is counted
+        for bill in edited:
+            db.refresh(bill)
+        statements.clear()
+        for bill in edited:
+            bill.amount += 1
+        db.commit()
+        return len(statements)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        few, many = select_count(bills[:2]), select_count(bills)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    db.close()
+    assert few == many
+    assert_store_matches(account_id)
+
+
+def test_store_dropped_on_account_soft_delete(materialized_account):
+    _, account_id = materialized_account
+    assert client.delete(f"/accounts/{account_id}").status_code == 200
+    db = TestingSessionLocal()
+    assert read_series(db, account_id, datetime.now().date(), HORIZON) is None
+    db.close()
+    assert client.get(f"/alerts?account_id={account_id}").json() == {
+        "error": "Account not found"
+    }
+    assert client.get(f"/alerts/tiers?account_id={account_id}").status_code == 404
+
+
+def test_override_of_moved_item_leaves_old_account(materialized_account):
+    user_id, account_id = materialized_account
+    today = datetime.now()
+    db = TestingSessionLocal()
+    other_id = add_account(db, user_id, name="Savings")
+    transaction = Transaction(
+        account_id=account_id,
+        name="Paycheck",
+        amount=500,
+        date=today + timedelta(days=2),
+        is_recurring=True,
+        recurrence="WEEKLY",
+    )
+    db.add(transaction)
+    db.flush()
+    override = ForecastOverride(
+        user_id=user_id,
+        account_id=account_id,
+        event_type="transaction",
+        event_id=transaction.id,
+        event_date=transaction.date.date() + timedelta(days=7),
+        override_amount=100,
+    )
+    db.add(override)
+    db.commit()
+    assert_store_matches(account_id)
+
+    transaction.account_id = other_id
+    db.commit()
+    assert_store_matches(account_id)
+
+    # The override no longer applies anywhere, so editing it changes nothing
+    override.override_amount = 300
+    db.commit()
+    db.close()
+    assert_store_matches(account_id)
+
+
+def test_store_patched_through_async_api(materialized_account):
+    _, account_id = materialized_account
+    today = datetime.now()
+    response = client.post(
+        "/bills/",
+        json={
+            "account_id": account_id,
+            "name": "Gym",
+            "amount": 40,
+            "start_date": today.isoformat(),
+            "recurrence": "WEEKLY",
+        },
+    )
+    assert response.status_code == 200
+    assert_store_matches(account_id)
+
+    assert client.delete(f"/bills/{response.json()['id']}").status_code == 200
+    assert_store_matches(account_id)
+
+
+def test_store_miss_computed_without_writing(materialized_account):
+    user_id, account_id = materialized_account
+    db = TestingSessionLocal()
+    today = datetime.now().date()
+    assert read_series(db, account_id, today, HORIZON + 30) is None
+    url = f"account_id={account_id}&months=12&buffer=0"
+    expected = client.get(f"/forecast?{url}").json()["alerts"]
+    assert client.get(f"/alerts?{url}").json() == {"alerts": expected}
+    # The longer read leaves the stored window as it was
+    assert read_series(db, account_id, today, HORIZON + 30) is None
+    assert_store_matches(account_id)
+
+    new_account_id = add_account(db, user_id, current_balance=10)
+    url = f"account_id={new_account_id}&buffer=50"
+    expected = client.get(f"/forecast?{url}").json()["alerts"]
+    assert client.get(f"/alerts?{url}").json() == {"alerts": expected}
+    assert read_series(db, new_account_id, today, 90) is None
+    db.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,47 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc
+
+from app.core.pool_metrics import InstrumentedQueuePool, pool_stats
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_pool_stats_count_checkouts_and_timeouts():
+    engine = create_engine(
+        "sqlite:///./test.db",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    conn = engine.connect()
+    stats = pool_stats(engine.pool)
+    assert (stats["size"], stats["checked_out"], stats["timeouts"]) == (1, 1, 0)
+
+    # The only connection is taken: the next checkout waits, then times out
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    stats = pool_stats(engine.pool)
+    assert (stats["checkouts"], stats["timeouts"]) == (2, 1)
+    assert stats["wait_seconds_max"] >= 0.05
+
+    conn.close()
+    stats = pool_stats(engine.pool)
+    assert (stats["checked_in"], stats["checked_out"]) == (1, 0)
+    engine.dispose()
+
+
+def test_internal_metrics_endpoint():
+    response = client.get("/internal/metrics")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["db_pool"]["class"] == "InstrumentedAsyncQueuePool"
+    assert {"checked_out", "overflow", "wait_seconds_avg"} <= set(data["db_pool"])
+    assert "hit_ratio" in data["forecast_cache"]
+    assert "compiled_rules" in data["recurrence_cache"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
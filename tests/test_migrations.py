@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, event, inspect
+
+from app.core.database import Base
+from app.core.specs import (load_account_specs, load_event_specs,
+                            load_override_specs)
+from app.models import Bill, ForecastOverride, Transaction
+from tests.conftest import TestingSessionLocal, engine
+from tests.helpers import add_account, get_or_create_user
+
+
+def test_migrations_build_the_model_schema(tmp_path):
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    config = Config("alembic.ini")
+    config.set_main_option("sqlalchemy.url", url)
+    config.attributes["configure_logger"] = False
+
+    command.upgrade(config, "head")
+    migrated = create_engine(url)
+    with migrated.connect() as conn:
+        assert compare_metadata(MigrationContext.configure(conn), Base.metadata) == []
+    command.downgrade(config, "base")
+    command.upgrade(config, "head")
+    migrated.dispose()
+
+
+def test_baseline_revision_is_the_create_all_schema(tmp_path):
+    url = f"sqlite:///{tmp_path / 'baseline.db'}"
+    config = Config("alembic.ini")
+    config.set_main_option("sqlalchemy.url", url)
+    config.attributes["configure_logger"] = False
+
+    # A database stamped at 0001 only has the tables create_all used to build
+    command.upgrade(config, "0001")
+    baseline = create_engine(url)
+    schema = inspect(baseline)
+    assert "forecast_daily_balances" not in schema.get_table_names()
+    for table in ("bills", "transactions"):
+        columns = {column["name"]: column for column in schema.get_columns(table)}
+        assert "amount_stddev" not in columns
+        assert "amount_samples" not in columns
+        assert columns["recurrence"]["type"].length == 20
+    baseline.dispose()
+
+    command.upgrade(config, "head")
+    migrated = create_engine(url)
+    with migrated.connect() as conn:
+        assert compare_metadata(MigrationContext.configure(conn), Base.metadata) == []
+    migrated.dispose()
+
+
+def test_forecast_queries_use_indexes():
+    db = TestingSessionLocal()
+    today = datetime.now()
+    user_id = get_or_create_user(db)
+    account_id = add_account(db, user_id, current_balance=100)
+    db.add(Bill(account_id=account_id, name="Rent", amount=30, start_date=today))
+    db.add(Transaction(account_id=account_id, name="Pay", amount=50, date=today))
+    db.add(
+        ForecastOverride(
+            user_id=user_id,
+            account_id=account_id,
+            event_type="bill",
+            event_id=1,
+            event_date=today.date(),
+            skip=True,
+        )
+    )
+    db.commit()
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        load_account_specs(db, user_id)
+        load_event_specs(db, [account_id])
+        load_override_specs(
+            db, [account_id], today.date(), today.date() + timedelta(days=90)
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    plans = []
+    for statement, parameters in statements:
+        rows = db.connection().exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}", parameters
+        )
+        plans.append(" | ".join(row.detail for row in rows))
+    db.close()
+    plan = "\n".join(plans)
+    for index in (
+        "ix_accounts_user_id_active",
+        "ix_bills_account_id_active",
+        "ix_transactions_account_id_date_active",
+        "ix_forecast_overrides_account_id_event_date",
+    ):
+        assert index in plan
+    # No full table scans
+    assert "SCAN accounts" not in plan
+    assert "SCAN bills" not in plan
+    assert "SCAN transactions" not in plan
+    assert "SCAN forecast_overrides" not in plan
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.core import nightly
+from app.core.forecasting import run_forecast
+from app.core.materialized import read_series
+from app.core.nightly import parse_args, run_nightly
+from app.models import Account, Bill, ForecastOverride, Transaction
+from tests.conftest import TestingSessionLocal
+from tests.helpers import add_account, get_or_create_user
+
+
+def make_accounts(db):
+    today = datetime.now()
+    user_id = get_or_create_user(db)
+    ids = [add_account(db, user_id, current_balance=100 * i) for i in range(1, 6)]
+    for i, account_id in enumerate(ids):
+        db.add(
+            Bill(
+                account_id=account_id,
+                name="Rent",
+                amount=10 + i,
+                start_date=today,
+                recurrence="WEEKLY",
+            )
+        )
+        db.add(
+            Transaction(
+                account_id=account_id,
+                name="Paycheck",
+                amount=50,
+                date=today + timedelta(days=i),
+                is_recurring=True,
+                recurrence="MONTHLY",
+            )
+        )
+    db.add(
+        ForecastOverride(
+            user_id=user_id,
+            account_id=ids[0],
+            event_type="bill",
+            event_id=1,
+            event_date=today.date(),
+            skip=True,
+        )
+    )
+    deleted = db.get(Account, ids[-1])
+    deleted.deleted_at = today
+    db.commit()
+    return ids
+
+
+def assert_stored_forecast(db, account_id, today):
+    overrides = {
+        (o.event_type, o.event_id, o.event_date): o
+        for o in db.query(ForecastOverride).filter_by(account_id=account_id)
+    }
+    expected = run_forecast(
+        db.get(Account, account_id),
+        db.query(Bill).filter_by(account_id=account_id).all(),
+        db.query(Transaction).filter_by(account_id=account_id).all(),
+        60,
+        overrides=overrides,
+        start_date=today,
+    )
+    stored = read_series(db, account_id, today, 60)
+    np.testing.assert_allclose(stored, expected.series)
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_run_nightly_materializes_every_active_account(workers):
+    db = TestingSessionLocal()
+    ids = make_accounts(db)
+    today = datetime.now().date()
+
+    stats = run_nightly(db, workers=workers, chunk_size=2, horizon_days=60)
+    assert stats["accounts"] == 4
+    assert stats["accounts_per_second"] > 0
+
+    for account_id in ids[:-1]:
+        assert_stored_forecast(db, account_id, today)
+    assert read_series(db, ids[-1], today, 60) is None
+    db.close()
+
+
+def test_run_nightly_keeps_changes_committed_while_computing(monkeypatch):
+    db = TestingSessionLocal()
+    ids = make_accounts(db)
+    today = datetime.now().date()
+    compute = nightly.forecast_chunk
+    changed = []
+
+    def forecast_chunk(jobs, start_date, horizon_days):
+        results = compute(jobs, start_date, horizon_days)
+        if not changed:
+            # Another session commits after the chunk was loaded
+            other = TestingSessionLocal()
+            other.query(Bill).filter_by(account_id=ids[0]).one().amount = 400
+            other.get(Account, ids[1]).deleted_at = datetime.now()
+            other.commit()
+            other.close()
+            changed.append(True)
+        return results
+
+    monkeypatch.setattr(nightly, "forecast_chunk", forecast_chunk)
+    stats = run_nightly(db, workers=0, chunk_size=2, horizon_days=60)
+    assert stats["accounts"] == 3
+    db.expire_all()
+    assert_stored_forecast(db, ids[0], today)
+    assert read_series(db, ids[1], today, 60) is None
+    db.close()
+
+
+def test_parse_args():
+    args = parse_args(["--workers", "3", "--chunk-size", "100"])
+    assert (args.workers, args.chunk_size) == (3, 100)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -1,8 +1,12 @@
-from datetime import datetime
+from datetime import date, datetime
+from itertools import islice
 
 import pytest
 
-from app.core.recurrence import expand_recurrence
+from app.core.recurrence import (clear_recurrence_cache, compile_rule,
+                                 expand_batch, expand_recurrence,
+                                 expand_recurrence_window, iter_recurrence,
+                                 recurrence_cache_stats, recurrence_window)
 
 
 def test_daily_recurrence():
@@ -105,5 +109,154 @@ def test_eom_leap_year():
     assert datetime(2024, 2, 29) in dates
 
 
+def test_window_skips_history_of_old_bill():
+    # A rent bill created in 2012 only yields the occurrences inside the window
+    dates = expand_recurrence_window(
+        date(2012, 3, 1), "MONTHLY", date(2024, 6, 1), date(2024, 8, 31)
+    )
+    assert dates == [date(2024, 6, 1), date(2024, 7, 1), date(2024, 8, 1)]
+
+
+def test_window_weekly_keeps_alignment():
+    dates = expand_recurrence_window(
+        date(2020, 1, 3), "WEEKLY", date(2024, 2, 20), date(2024, 3, 8)
+    )
+    assert dates == [date(2024, 2, 23), date(2024, 3, 1), date(2024, 3, 8)]
+
+
+def test_window_monthly_on_31st_and_eom():
+    assert expand_recurrence_window(
+        date(2023, 1, 31), "MONTHLY", date(2024, 2, 1), date(2024, 4, 30)
+    ) == [date(2024, 3, 31)]
+    assert expand_recurrence_window(
+        date(2023, 1, 15), "EOM", date(2024, 2, 1), date(2024, 4, 30)
+    ) == [date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30)]
+
+
+def test_window_yearly_leap_day():
+    dates = expand_recurrence_window(
+        date(2016, 2, 29), "YEARLY", date(2021, 1, 1), date(2028, 12, 31)
+    )
+    assert dates == [date(2024, 2, 29), date(2028, 2, 29)]
+
+
+@pytest.mark.parametrize("rule", ["DAILY", "WEEKLY", "MONTHLY", "YEARLY", "EOM"])
+def test_window_matches_full_expansion(rule):
+    start = datetime(2019, 1, 31)
+    window_start, window_end = date(2023, 11, 15), date(2024, 3, 20)
+    expected = [
+        d
+        for d in expand_recurrence(start, rule, datetime(2024, 3, 20))
+        if window_start <= d.date() <= window_end
+    ]
+    assert expand_recurrence_window(start, rule, window_start, window_end) == expected
+
+
+def test_window_non_recurring():
+    assert expand_recurrence_window(
+        date(2024, 5, 1), None, date(2024, 4, 1), date(2024, 5, 31)
+    ) == [date(2024, 5, 1)]
+    assert (
+        expand_recurrence_window(
+            date(2024, 5, 1), None, date(2024, 5, 2), date(2024, 5, 31)
+        )
+        == []
+    )
+
+
+def test_iter_recurrence_open_ended_is_lazy():
+    # No end date: the generator only computes what the caller consumes
+    dates = list(islice(iter_recurrence(date(2024, 1, 31), "EOM"), 3))
+    assert dates == [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31)]
+
+
+def test_iter_recurrence_window_start():
+    dates = iter_recurrence(date(1990, 1, 1), "DAILY", window_start=date(2024, 6, 1))
+    assert next(dates) == date(2024, 6, 1)
+
+
+def test_recurrence_window_is_memoized():
+    clear_recurrence_cache()
+    window = (date(2024, 6, 1), date(2024, 8, 31))
+    first = recurrence_window(datetime(2012, 3, 1), "monthly", *window)
+    second = recurrence_window(date(2012, 3, 1), " MONTHLY", *window)
+    assert first == second == (date(2024, 6, 1), date(2024, 7, 1), date(2024, 8, 1))
+    stats = recurrence_cache_stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+    assert stats["size"] == 1
+
+
+def test_rrule_every_other_friday():
+    dates = expand_recurrence(
+        datetime(2024, 1, 1), "FREQ=WEEKLY;INTERVAL=2;BYDAY=FR", datetime(2024, 2, 10)
+    )
+    assert dates == [datetime(2024, 1, 5), datetime(2024, 1, 19), datetime(2024, 2, 2)]
+
+
+def test_rrule_15th_and_last_day_of_month_in_window():
+    dates = expand_recurrence_window(
+        date(2015, 6, 1),
+        "RRULE:FREQ=MONTHLY;BYMONTHDAY=15,-1",
+        date(2024, 2, 1),
+        date(2024, 3, 31),
+    )
+    assert dates == [
+        date(2024, 2, 15),
+        date(2024, 2, 29),
+        date(2024, 3, 15),
+        date(2024, 3, 31),
+    ]
+
+
+def test_rrule_last_weekday_and_count():
+    dates = expand_recurrence(
+        datetime(2024, 1, 1),
+        "FREQ=MONTHLY;BYDAY=MO,TU,WE,TH,FR;BYSETPOS=-1;COUNT=3",
+        datetime(2024, 12, 31),
+    )
+    assert dates == [
+        datetime(2024, 1, 31),
+        datetime(2024, 2, 29),
+        datetime(2024, 3, 29),
+    ]
+
+
+def test_compile_rule_is_cached_and_normalized():
+    rule = compile_rule("freq=weekly;byday=FR;interval=2")
+    assert rule is compile_rule("freq=weekly;byday=FR;interval=2")
+    assert rule.text == "FREQ=WEEKLY;INTERVAL=2;BYDAY=FR"
+    assert compile_rule("FREQ=MONTHLY;BYMONTHDAY=-1").keyword == "EOM"
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        "FREQ=HOURLY",
+        "FREQ=WEEKLY;BYDAY=XX",
+        "FREQ=MONTHLY;BYMONTHDAY=0",
+        "FREQ=DAILY;BYSECOND=1",
+    ],
+)
+def test_invalid_rrule(rule):
+    with pytest.raises(ValueError):
+        compile_rule(rule)
+
+
+def test_expand_batch_offsets_and_index():
+    offsets, index = expand_batch(
+        [
+            (datetime(2023, 12, 25), "WEEKLY", None),
+            (datetime(2024, 1, 3), None, None),
+            (datetime(2024, 1, 1), "DAILY", datetime(2024, 1, 2)),
+            (datetime(2024, 2, 1), "MONTHLY", None),
+        ],
+        date(2024, 1, 1),
+        date(2024, 1, 14),
+    )
+    assert offsets.tolist() == [0, 7, 2, 0, 1]
+    assert index.tolist() == [0, 0, 1, 2, 2]
+
+
 if __name__ == "__main__":
     pytest.main(["-v", __file__])
@@ -0,0 +1,102 @@
+import pickle
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.forecasting import run_forecast
+from app.core.specs import (AccountSpec, EventSpec, OverrideSpec,
+                            load_account_specs, load_event_specs,
+                            load_override_specs, transaction_spec)
+from app.models import Account, Bill, ForecastOverride, Transaction
+from tests.conftest import TestingSessionLocal
+from tests.helpers import add_account, get_or_create_user
+
+
+def test_load_specs_with_column_only_queries():
+    db = TestingSessionLocal()
+    today = datetime(2024, 1, 1)
+    user_id = get_or_create_user(db)
+    account_id = add_account(db, user_id, current_balance=100)
+    other_id = add_account(db, user_id)
+    db.get(Account, other_id).deleted_at = today
+    db.add_all(
+        [
+            Bill(
+                account_id=account_id,
+                name="Rent",
+                amount=30,
+                start_date=today,
+                recurrence="WEEKLY",
+            ),
+            Bill(
+                account_id=account_id,
+                name="Old",
+                amount=5,
+                start_date=today,
+                deleted_at=today,
+            ),
+            Transaction(
+                account_id=account_id,
+                name="Refund",
+                amount=20,
+                date=today,
+                recurrence="MONTHLY",  # Ignored: not recurring
+            ),
+            ForecastOverride(
+                user_id=user_id,
+                account_id=account_id,
+                event_type="bill",
+                event_id=1,
+                event_date=today.date() + timedelta(days=7),
+                skip=True,
+            ),
+        ]
+    )
+    db.commit()
+
+    assert load_account_specs(db, user_id) == [AccountSpec(account_id, 100)]
+    bills, transactions = load_event_specs(db, [account_id])
+    assert bills[account_id] == [EventSpec(1, 30, today, None, "WEEKLY", "Rent")]
+    assert transactions[account_id] == [EventSpec(1, 20, today, name="Refund")]
+    overrides = load_override_specs(
+        db, [account_id], today.date(), today.date() + timedelta(days=30)
+    )
+    assert overrides == {
+        account_id: {("bill", 1, today.date() + timedelta(days=7)): OverrideSpec(True)}
+    }
+
+    # Specs forecast exactly like the ORM objects they came from
+    account = db.get(Account, account_id)
+    orm_bills = db.query(Bill).filter(Bill.deleted_at.is_(None)).all()
+    orm_transactions = db.query(Transaction).all()
+    expected = run_forecast(
+        account,
+        orm_bills,
+        orm_transactions,
+        30,
+        overrides=overrides[account_id],
+        start_date=today.date(),
+    )
+    db.close()
+    specs = pickle.loads(
+        pickle.dumps((AccountSpec(account_id, 100), bills, transactions))
+    )
+    result = run_forecast(
+        specs[0],
+        specs[1][account_id],
+        specs[2][account_id],
+        30,
+        overrides=overrides[account_id],
+        start_date=today.date(),
+    )
+    assert result.series.tolist() == expected.series.tolist()
+    assert result.events == expected.events
+
+
+def test_transaction_spec_passes_specs_through():
+    spec = EventSpec(1, 10.0, datetime(2024, 1, 1), rule="DAILY")
+    assert transaction_spec(spec) is spec
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -8,7 +8,7 @@ client = TestClient(app)
 def test_list_users_initially_empty():
     response = client.get("/users")
     assert response.status_code == 200
-    assert isinstance(response.json(), list)
+    assert response.json() == {"items": [], "next_cursor": None}
 
 
 def test_create_user():
@@ -38,8 +38,9 @@ def test_list_users_after_creation():
     # List users
     response = client.get("/users")
     assert response.status_code == 200
-    users = response.json()
+    users = response.json()["items"]
     assert any(u["email"] == "anotheruser@example.com" for u in users)
+    assert all("hashed_password" not in u for u in users)
 
 
 if __name__ == "__main__":